@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark and import-time budget report for the Vercel entry point.
+
+Starts a fresh interpreter --runs times (after one warm-up run that creates
+the database). Each one imports api/index.py under ``python -X importtime``
+and serves one request, the way a new serverless instance does. The report
+shows p50/p99 of the import, the first request and the total, followed by
+what each module costs to import: the project's own modules and the
+third-party packages, by median cumulative and self time.
+
+    python benchmark_cold_start.py [--runs 20] [--top 25] [--path /api/notes?limit=1] [--budget-ms 800]
+
+With --budget-ms the script exits with status 1 when the p50 total is over
+the budget. DATABASE_SERVERLESS=1 is set, as on Vercel.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+CHILD = '''
+import io, sys, json, time, contextlib
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from api.index import app
+    imported = time.perf_counter()
+    status = app.test_client().get({path!r}).status_code
+finished = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - started) * 1000,
+                  "first_request_ms": (finished - imported) * 1000, "status": status}}))
+'''
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from ``-X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_once(env, path):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(root=ROOT, path=path)],
+        env=env, capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def is_reported(name):
+    # The project's modules, and third-party packages as a whole
+    return name.startswith(('src', 'api')) or '.' not in name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--top', type=int, default=25, help='modules to list in the budget report')
+    parser.add_argument('--path', default='/api/notes?limit=1', help='first request to serve')
+    parser.add_argument('--budget-ms', type=float, help='fail if the p50 cold start is over this')
+    args = parser.parse_args()
+
+    timings = defaultdict(list)
+    module_times = defaultdict(list)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DATABASE_URL=os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(directory, 'bench.db')}"),
+            DATABASE_SERVERLESS='1',
+        )
+        run_once(env, args.path)
+        for _ in range(args.runs):
+            result, modules = run_once(env, args.path)
+            timings['import'].append(result['import_ms'])
+            timings['first request'].append(result['first_request_ms'])
+            timings['total'].append(result['import_ms'] + result['first_request_ms'])
+            for name, times in modules.items():
+                if is_reported(name):
+                    module_times[name].append(times)
+
+    print(f"⏱️  {args.runs} cold starts, first request GET {args.path} (status {result['status']})\n")
+    print(f"{'phase':<14} {'p50 ms':>8} {'p99 ms':>8}")
+    for phase, values in timings.items():
+        print(f"{phase:<14} {percentile(values, 0.5):>8.1f} {percentile(values, 0.99):>8.1f}")
+
+    report = sorted(
+        ((name, percentile([c for _, c in times], 0.5) / 1000, percentile([s for s, _ in times], 0.5) / 1000,
+          len(times) / args.runs) for name, times in module_times.items()),
+        key=lambda row: row[1], reverse=True,
+    )
+    print(f"\n{'module':<44} {'cumul. ms':>10} {'self ms':>8} {'runs':>5}")
+    for name, cumulative, self_ms, share in report[:args.top]:
+        print(f"{name:<44} {cumulative:>10.1f} {self_ms:>8.1f} {share:>5.0%}")
+
+    if args.budget_ms is not None:
+        p50 = percentile(timings['total'], 0.5)
+        if p50 > args.budget_ms:
+            print(f"\n❌ p50 cold start {p50:.1f} ms is over the {args.budget_ms:g} ms budget")
+            sys.exit(1)
+        print(f"\n✅ p50 cold start {p50:.1f} ms is within the {args.budget_ms:g} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write benchmark for the SQLite storage profile.
+
+Runs the same workload against a fresh SQLite database twice, with
+SQLITE_TUNING=0 (default SQLite settings) and SQLITE_TUNING=1 (WAL,
+pragmas and the read-only pool, see src/services/sqlite_storage.py):
+writer threads autosave random notes with PUT while reader threads list
+and open notes with GET. The read cache is disabled so every request
+reaches the database.
+
+    python benchmark_sqlite.py [--seconds 10] [--writers 4] [--readers 8] [--notes 500]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_workload(args):
+    """Child process: run the workload and print the results as JSON"""
+    import io
+    import contextlib
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        from src.main import app
+
+    client = app.test_client()
+    body = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 40
+    client.post('/api/notes/batch', json={'operations': [
+        {'op': 'create', 'title': f'Note {i}', 'content': body} for i in range(args.notes)
+    ]})
+    note_ids = [note['id'] for note in client.get('/api/notes').get_json()]
+
+    results = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(kind):
+        client = app.test_client()
+        rng = random.Random()
+        latencies = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if kind == 'write':
+                note_id = rng.choice(note_ids)
+                response = client.put(f'/api/notes/{note_id}', json={'content': f'{body} {rng.random()}'})
+                ok = response.status_code in (200, 409)
+            elif rng.random() < 0.5:
+                response = client.get('/api/notes?limit=50')
+                ok = response.status_code == 200
+            else:
+                response = client.get(f'/api/notes/{rng.choice(note_ids)}')
+                ok = response.status_code == 200
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        with lock:
+            results[kind].extend(latencies)
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=worker, args=('write',)) for _ in range(args.writers)]
+    threads += [threading.Thread(target=worker, args=('read',)) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        kind: {
+            'ops_per_second': round(len(results[kind]) / args.seconds, 1),
+            'p50_ms': round(percentile(results[kind], 0.5) * 1000, 2) if results[kind] else None,
+            'p95_ms': round(percentile(results[kind], 0.95) * 1000, 2) if results[kind] else None,
+            'errors': errors[kind],
+        }
+        for kind in ('read', 'write')
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--notes', type=int, default=500)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_workload(args)
+        return
+
+    print(f"⏱️  {args.writers} writers, {args.readers} readers, {args.notes} notes, {args.seconds:g}s per run\n")
+    print(f"{'profile':<10} {'kind':<6} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for tuning in ('0', '1'):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(directory, 'bench.db')}",
+                SQLITE_TUNING=tuning,
+                READ_CACHE_ENABLED='0',
+                JOB_WORKERS='0',
+            )
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', *sys.argv[1:]],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        profile = 'tuned' if tuning == '1' else 'default'
+        for kind in ('read', 'write'):
+            row = result[kind]
+            print(f"{profile:<10} {kind:<6} {row['ops_per_second']:>8} {row['p50_ms']!s:>8} {row['p95_ms']!s:>8} {row['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Maintenance commands, run with the Flask CLI:
+
+    flask --app src.main rebuild-search-index
+    flask --app src.main run-jobs
+    flask --app src.main import-notes notes.zip
+    flask --app src.main compact-tombstones
+    flask --app src.main upgrade-schema [--drop-legacy-content]
+"""
+import os
+import time
+import click
+from src.models.user import db
+
+
+def register_commands(app):
+    """Attach the maintenance commands to the Flask app"""
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Rebuild the full-text search index from the note table"""
+        from src.services.search import search_index
+
+        started = time.perf_counter()
+        backend = search_index.rebuild(db.engine)
+        click.echo(f"Rebuilt {backend} search index in {time.perf_counter() - started:.2f}s")
+
+    @app.cli.command('run-jobs')
+    @click.option('--limit', type=int, default=None, help='Stop after running this many jobs')
+    def run_jobs(limit):
+        """Run queued background jobs in this process until the queue is empty"""
+        from src.services.jobs import job_queue
+
+        started = time.perf_counter()
+        count = job_queue.run_pending(limit)
+        click.echo(f"Ran {count} job(s) in {time.perf_counter() - started:.2f}s")
+
+    @app.cli.command('import-notes')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'import_format', type=click.Choice(['markdown', 'zip', 'ndjson']), default=None,
+                  help='Input format (default: from the file extension)')
+    @click.option('--resume', default=None, help='Id of a failed import to continue')
+    @click.option('--batch-size', type=int, default=None, help='Notes per transaction')
+    def import_notes(path, import_format, resume, batch_size):
+        """Bulk-import notes from a Markdown file, ZIP archive or NDJSON file"""
+        from src.services.note_import import import_notes, detect_format, NoteImportError, IMPORT_BATCH_SIZE
+
+        import_format = import_format or detect_format(path)
+        if import_format is None:
+            raise click.UsageError('Cannot tell the format from the file name; pass --format')
+
+        def progress(stats):
+            click.echo(f"  batch {stats['batches']}: {stats['imported']} notes, {stats['notes_per_second']} notes/s")
+
+        with open(path, 'rb') as f:
+            try:
+                stats = import_notes(f, import_format, os.path.basename(path), resume=resume,
+                                     batch_size=batch_size or IMPORT_BATCH_SIZE, on_batch=progress)
+            except NoteImportError as e:
+                raise click.ClickException(
+                    f"{e} (committed {e.note_import.records_committed} notes; "
+                    f"continue with --resume {e.note_import.id})"
+                )
+            except ValueError as e:
+                raise click.ClickException(str(e))
+
+        click.echo(
+            f"Imported {stats['imported']} notes (skipped {stats['skipped']}) in {stats['seconds']}s, "
+            f"{stats['notes_per_second']} notes/s, import id {stats['import_id']}"
+        )
+
+    @app.cli.command('compact-tombstones')
+    @click.option('--days', type=float, default=None, help='Keep tombstones newer than this many days')
+    def compact_tombstones(days):
+        """Delete old note tombstones from the change feed"""
+        from src.services.changes import compact_tombstones, TOMBSTONE_RETENTION_DAYS
+
+        removed = compact_tombstones(db.session, TOMBSTONE_RETENTION_DAYS if days is None else days)
+        click.echo(f"Removed {removed} tombstone(s)")
+
+    @app.cli.command('upgrade-schema')
+    @click.option('--force', is_flag=True, help='Run every upgrade step even if the schema looks current')
+    @click.option('--drop-legacy-content', is_flag=True,
+                  help='Drop the old note.content column after verifying that note_content has every body')
+    def upgrade_schema(force, drop_legacy_content):
+        """Create and upgrade the database schema"""
+        from src.models import migrations
+
+        started = time.perf_counter()
+        upgraded = migrations.ensure_schema(force=force)
+        state = 'Upgraded' if upgraded else 'Already current:'
+        click.echo(f"{state} schema in {time.perf_counter() - started:.2f}s")
+
+        if drop_legacy_content:
+            try:
+                dropped = migrations.drop_legacy_content()
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            click.echo("Dropped the legacy note.content column" if dropped else "No legacy note.content column")
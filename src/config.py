@@ -0,0 +1,40 @@
+"""
+Application configuration, read once at startup.
+
+Importing this module loads the project's .env file (with python-dotenv, or
+the manual loader in src/env_loader.py when it is not installed). Modules
+that read their settings from environment variables at import time are
+imported after it, so nothing else needs to load .env again.
+"""
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_FILE = os.path.join(ROOT_DIR, '.env')
+
+
+def load_env(env_file=ENV_FILE):
+    """Load ``env_file`` into os.environ; returns whether a file was loaded"""
+    if not os.path.exists(env_file):
+        return False
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        from src.env_loader import load_env_manual
+        return load_env_manual(env_file)
+    return load_dotenv(env_file)
+
+
+ENV_LOADED = load_env()
+
+from src.models.engine import engine_options  # noqa: E402 (reads settings loaded above)
+
+
+class Config:
+    SECRET_KEY = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
+
+    # Supabase PostgreSQL, or SQLite for local development
+    DATABASE_CONFIGURED = bool(os.getenv('DATABASE_URL'))
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or \
+        f"sqlite:///{os.path.join(ROOT_DIR, 'src', 'database', 'app.db')}"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
@@ -36,7 +36,3 @@ def load_env_manual(env_file_path=None):
     except Exception as e:
         print(f"Error reading .env file: {e}")
         return False
-
-# Auto-load when imported
-if __name__ != "__main__":
-    load_env_manual()
\ No newline at end of file
@@ -1,88 +1,59 @@
 import os
 import sys
+import threading
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-# Try to load environment variables
-env_loaded = False
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    env_loaded = True
-    print("✅ Environment variables loaded from .env file using python-dotenv")
-except ImportError:
-    print("python-dotenv not available, trying manual loader")
-    try:
-        # Manual .env loading
-        env_file = os.path.join(os.path.dirname(__file__), '..', '.env')
-        if os.path.exists(env_file):
-            with open(env_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    os.environ[key] = value
-            
-            env_loaded = True
-            print("✅ Environment variables loaded manually from .env file")
-        else:
-            print("❌ .env file not found")
-    except Exception as e:
-        print(f"❌ Manual env loader failed: {e}")
-except Exception as e:
-    print(f"❌ Error loading .env file: {e}")
-
-# Verify critical environment variables
-github_token = os.getenv('GITHUB_AI_TOKEN')
-if github_token:
-    print(f"✅ GITHUB_AI_TOKEN found (starts with: {github_token[:20]}...)")
-else:
-    print("❌ GITHUB_AI_TOKEN not found in environment variables")
-
-from flask import Flask, send_from_directory, jsonify
+# Loads .env once, before any module reads its settings
+from src.config import Config
+
+from flask import Flask, current_app, send_from_directory, jsonify
 from flask_cors import CORS
 from src.models.user import db
-from src.routes.user import user_bp
-from src.routes.note import note_bp
 from src.models.note import Note
+from src.models.note_content import NoteContent
+from src.models.translation_cache import TranslationCacheEntry
+from src.models.note_translation import NoteTranslation
+from src.models.job import Job
+from src.models.note_import import NoteImport
+from src.models.change_log import ChangeCounter, NoteTombstone
+from src.models.migrations import ensure_schema
+from src.models.schema_state import SchemaState
+from src.models.engine import SERVERLESS
+from src.services.lazy import translation_service
+from src.services.translation_cache import translation_cache
+from src.services.jobs import job_queue, JOB_WORKERS
+from src.services.read_cache import read_cache
+from src.services.sqlite_storage import sqlite_storage
+from src.services.read_replica import read_replica
+from src.services.request_timing import request_timing
+from src.services.metrics import metrics
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-
-# Use environment variables for configuration
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
-
-# Enable CORS for all routes
-CORS(app)
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(note_bp, url_prefix='/api')
 
-# Add health check endpoint
-@app.route('/api/health')
 def health_check():
     # Check translation service
     translation_available = False
     translation_error = None
     try:
-        from src.services.translation import translation_service
-        translation_available = translation_service.is_configured()
+        translation_available = bool(translation_service) and translation_service.is_configured()
         if not translation_available:
-            translation_error = "Service not configured"
+            translation_error = translation_service.error or "Service not configured"
     except Exception as e:
         translation_error = str(e)
-    
+
     return jsonify({
         "status": "ok",
         "message": "NoteTaker API is running",
-        "database_configured": bool(os.getenv('DATABASE_URL')),
+        "database_configured": current_app.config['DATABASE_CONFIGURED'],
         "translation_available": translation_available,
         "translation_error": translation_error,
         "github_token_available": bool(os.getenv('GITHUB_AI_TOKEN')),
+        "translation_cache": translation_cache.stats(),
+        "read_cache": read_cache.stats(),
+        "sqlite": sqlite_storage.stats(),
+        "read_replica": read_replica.stats(),
+        "jobs": job_queue.stats(),
         "environment": {
             "VERCEL": os.getenv('VERCEL'),
             "DEPLOYMENT_URL": os.getenv('DEPLOYMENT_URL'),
@@ -91,7 +62,6 @@ def health_check():
         }
     })
 
-@app.route('/api/debug/translation')
 def debug_translation():
     """Debug endpoint to check translation service status"""
     debug_info = {
@@ -104,7 +74,7 @@ def debug_translation():
         "python_path": sys.path[:3],  # First 3 entries
         "errors": []
     }
-    
+
     # Test requests import
     try:
         import requests
@@ -112,18 +82,15 @@ def debug_translation():
         debug_info["requests_version"] = requests.__version__
     except ImportError as e:
         debug_info["errors"].append(f"Requests import failed: {e}")
-    
+
     # Test translation service
     try:
-        from src.services.translation import translation_service
+        if not translation_service:
+            raise RuntimeError(translation_service.error)
         debug_info["translation_service_available"] = True
         debug_info["translation_service_configured"] = translation_service.is_configured()
-        
-        if hasattr(translation_service, 'client'):
-            debug_info["service_client_exists"] = translation_service.client is not None
-        if hasattr(translation_service, 'token'):
-            debug_info["service_token_exists"] = translation_service.token is not None
-            
+        debug_info["service_token_exists"] = translation_service.token is not None
+
         # Try a quick translation test
         if translation_service.is_configured():
             try:
@@ -139,28 +106,11 @@ def debug_translation():
         debug_info["errors"].append(f"Translation service error: {e}")
         import traceback
         debug_info["traceback"] = traceback.format_exc()
-    
-    return jsonify(debug_info)
-
-# Configure Supabase PostgreSQL database
-database_url = os.getenv('DATABASE_URL')
-if database_url:
-    # Use Supabase PostgreSQL
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-else:
-    # Fallback to SQLite for local development
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-with app.app_context():
-    db.create_all()
+    return jsonify(debug_info)
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if static_folder_path is None:
             return "Static folder not configured", 404
 
@@ -174,6 +124,74 @@ def serve(path):
             return "index.html not found", 404
 
 
+def register_blueprints(app):
+    from src.routes.user import user_bp
+    from src.routes.note import note_bp
+    from src.routes.stream import stream_bp
+    from src.routes.job import job_bp
+    from src.cli import register_commands
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(note_bp, url_prefix='/api')
+    app.register_blueprint(stream_bp, url_prefix='/api')
+    app.register_blueprint(job_bp, url_prefix='/api')
+    register_commands(app)
+
+    app.add_url_rule('/api/health', view_func=health_check)
+    app.add_url_rule('/api/debug/translation', view_func=debug_translation)
+    app.add_url_rule('/', defaults={'path': ''}, view_func=serve)
+    app.add_url_rule('/<path:path>', view_func=serve)
+
+
+def init_database(app):
+    db.init_app(app)
+    sqlite_storage.init_app(app)
+    read_replica.init_app(app)
+
+    if SERVERLESS:
+        # Cold starts do no database I/O: the first request of each instance
+        # checks the schema (one query when it is current) and resumes jobs
+        job_queue.init_app(app, recover=False)
+        database_ready = False
+        database_lock = threading.Lock()
+
+        @app.before_request
+        def prepare_database():
+            nonlocal database_ready
+            if database_ready:
+                return
+            with database_lock:
+                if not database_ready:
+                    ensure_schema()
+                    if JOB_WORKERS > 0:
+                        job_queue.recover()
+                    database_ready = True
+    else:
+        with app.app_context():
+            ensure_schema()
+
+        # Resume background jobs left queued or abandoned by earlier runs
+        job_queue.init_app(app)
+
+
+def create_app(config=Config):
+    """Build the Flask app; ``config`` is a class or object with the settings"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.from_object(config)
+
+    # Enable CORS for all routes
+    CORS(app)
+    request_timing.init_app(app)
+
+    register_blueprints(app)
+    init_database(app)
+    metrics.init_app(app, db)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     # Use environment variables for host and port
     host = os.getenv('HOST', '0.0.0.0')
@@ -0,0 +1,57 @@
+from datetime import datetime
+from src.models.user import db
+
+class ChangeCounter(db.Model):
+    """
+    Named monotonic counters. The ``note`` row hands out change_seq values;
+    ``note_tombstones_compacted`` remembers the newest tombstone that has
+    been compacted away.
+    """
+    __tablename__ = 'change_counter'
+
+    name = db.Column(db.String(40), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ChangeCounter {self.name}={self.value}>'
+
+    @classmethod
+    def allocate(cls, connection, name, count=1):
+        """
+        Reserve ``count`` consecutive values and return the first one.
+
+        The UPDATE locks the counter row until the transaction ends, so
+        writers commit in the order of the values they were given and a
+        reader never sees a value before the ones below it are committed.
+        """
+        table = cls.__table__
+        updated = connection.execute(
+            table.update().where(table.c.name == name).values(value=table.c.value + count)
+        ).rowcount
+        if not updated:
+            connection.execute(table.insert().values(name=name, value=count))
+        last = connection.execute(db.select(table.c.value).where(table.c.name == name)).scalar()
+        return last - count + 1
+
+    @classmethod
+    def current(cls, session, name):
+        """Current value of a counter (0 if it was never used)"""
+        return session.execute(db.select(cls.value).where(cls.name == name)).scalar() or 0
+
+class NoteTombstone(db.Model):
+    """Marks a deleted note so clients syncing with /api/notes/changes can drop it"""
+    __tablename__ = 'note_tombstone'
+
+    note_id = db.Column(db.Integer, primary_key=True)
+    change_seq = db.Column(db.BigInteger, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<NoteTombstone {self.note_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.note_id,
+            'change_seq': self.change_seq,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
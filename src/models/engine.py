@@ -0,0 +1,50 @@
+"""
+SQLAlchemy engine settings for the deployment the app runs in.
+
+On serverless hosts (Vercel, or DATABASE_SERVERLESS=1) many short-lived
+instances each hold their own pool, so a PostgreSQL deployment uses no
+pool at all by default (DATABASE_POOL=null): every request borrows a
+connection from the server-side pooler (Supabase/PgBouncer) and gives it
+back. DATABASE_POOL=queue keeps a small pre-pinged, recycled pool per
+instance instead (DATABASE_POOL_SIZE, default 1, plus DATABASE_MAX_OVERFLOW).
+Prepared-statement caching is turned off for drivers that have it, since
+transaction-mode poolers hand each transaction a different server
+connection.
+
+Long-running servers keep a regular pool with pre-ping and recycling.
+Engines never connect before their first query.
+"""
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+SERVERLESS = os.getenv('DATABASE_SERVERLESS', '1' if os.getenv('VERCEL') else '0') == '1'
+POOL = os.getenv('DATABASE_POOL', 'null' if SERVERLESS else 'queue')
+POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 1 if SERVERLESS else 5))
+MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', 2 if SERVERLESS else 10))
+POOL_RECYCLE = int(os.getenv('DATABASE_POOL_RECYCLE', 300 if SERVERLESS else 1800))
+CONNECT_TIMEOUT = int(os.getenv('DATABASE_CONNECT_TIMEOUT', 10))
+
+
+def engine_options(url):
+    """Keyword arguments for create_engine (SQLALCHEMY_ENGINE_OPTIONS) for ``url``"""
+    url = make_url(url)
+    if url.get_backend_name() != 'postgresql':
+        # SQLite is tuned by src/services/sqlite_storage.py
+        return {}
+
+    connect_args = {'connect_timeout': CONNECT_TIMEOUT, 'application_name': 'notetaker'}
+    if url.get_driver_name() == 'psycopg':
+        # psycopg 3 prepares repeated statements server-side; psycopg2 never does
+        connect_args['prepare_threshold'] = None
+
+    if POOL == 'null':
+        return {'poolclass': NullPool, 'connect_args': connect_args}
+    return {
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'pool_pre_ping': True,
+        'pool_recycle': POOL_RECYCLE,
+        'pool_timeout': 10,
+        'connect_args': connect_args,
+    }
@@ -0,0 +1,50 @@
+import json
+import uuid
+from datetime import datetime
+from src.models.user import db
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+class Job(db.Model):
+    """A unit of background work (LLM calls) and its persisted outcome"""
+    __tablename__ = 'job'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    type = db.Column(db.String(40), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=JOB_QUEUED)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Finding queued and abandoned jobs on startup
+        db.Index('ix_job_status_created_at', 'status', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.type} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'params': json.loads(self.params) if self.params else {},
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'progress': self.progress,
+            'total': self.total,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,293 @@
+"""
+Idempotent schema upgrades for databases created by older versions of the app.
+
+db.create_all() only creates missing tables, so indexes and columns added to
+existing models have to be applied here. Every step must be safe to run on
+each startup.
+
+ensure_schema() runs them only when needed: it compares a fingerprint of the
+models and of this module's steps with the one stored by the last upgrade,
+so an up-to-date database costs one query per process start.
+
+Nothing here destroys data on its own: bodies are copied out of the legacy
+note.content column, which is only dropped by
+``flask --app src.main upgrade-schema --drop-legacy-content``.
+"""
+import os
+import hashlib
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from src.models.user import db
+from src.models.schema_state import SchemaState
+from src.models.note import Note, LEGACY_CONTENT, configure_legacy_content
+from src.models.note_content import NoteContent, configure_note_storage
+from src.models.change_log import ChangeCounter
+from src.services import search
+from src.services.search import search_index
+
+# Bump when upgrade_schema() gains a step the models do not reflect (e.g. a backfill)
+SCHEMA_REVISION = 1
+
+# pg_advisory_xact_lock key taken while upgrading (any constant shared by all instances)
+SCHEMA_LOCK_KEY = 7_366_210_051_224_716
+# How long an SQLite process waits for another one's upgrade
+SCHEMA_LOCK_TIMEOUT_SECONDS = 600
+
+_schema_ready = False
+
+
+def schema_fingerprint(dialect):
+    """Hash of every table, column and index, the search DDL and SCHEMA_REVISION"""
+    parts = [f'revision {SCHEMA_REVISION}']
+    for table in db.metadata.sorted_tables:
+        parts.append(f'table {table.name}')
+        for column in table.columns:
+            if column.info.get('legacy'):
+                continue
+            parts.append(f'  {column.name} {column.type.compile(dialect=dialect)} {column.nullable}')
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            parts.append(f'  index {index.name} {[column.name for column in index.columns]}')
+    parts += search.SQLITE_SETUP if dialect.name == 'sqlite' else search.POSTGRES_SETUP
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def read_schema_state(engine):
+    """The stored schema_state row, or None"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                db.select(SchemaState.fingerprint, SchemaState.search_backend, SchemaState.legacy_content)
+                .where(SchemaState.name == 'app')
+            ).first()
+    except SQLAlchemyError:
+        # A database from before schema_state existed
+        return None
+
+
+@contextmanager
+def schema_upgrade_lock(engine):
+    """
+    Keep other processes and instances out while this one upgrades. PostgreSQL
+    takes a transaction-level advisory lock (released with the transaction,
+    so it also works through a transaction-mode pooler). SQLite takes BEGIN
+    IMMEDIATE on a lock database in the temp directory, since the upgrade
+    steps write the real database through connections of their own.
+    """
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn, conn.begin():
+            conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': SCHEMA_LOCK_KEY})
+            yield
+    elif engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+        path = os.path.abspath(engine.url.database)
+        name = f"notetaker-schema-{hashlib.sha256(path.encode('utf-8')).hexdigest()[:16]}.lock"
+        lock = sqlite3.connect(os.path.join(tempfile.gettempdir(), name),
+                               timeout=SCHEMA_LOCK_TIMEOUT_SECONDS, isolation_level=None)
+        try:
+            lock.execute('BEGIN IMMEDIATE')
+            yield
+        finally:
+            lock.close()
+    else:
+        yield
+
+
+def ensure_schema(force=False):
+    """
+    Create and upgrade the schema unless the database already matches the
+    current models. Returns True if an upgrade ran. Concurrent callers
+    (several instances starting at once) upgrade one at a time, and the ones
+    that waited find the schema current.
+    """
+    global _schema_ready
+    if _schema_ready and not force:
+        return False
+
+    engine = db.engine
+    fingerprint = schema_fingerprint(engine.dialect)
+    state = read_schema_state(engine)
+    if state is None or state.fingerprint != fingerprint or force:
+        with schema_upgrade_lock(engine):
+            state = read_schema_state(engine)
+            if state is None or state.fingerprint != fingerprint or force:
+                upgrade_and_record(fingerprint)
+                _schema_ready = True
+                return True
+
+    configure_note_storage(engine)
+    configure_legacy_content(bool(state.legacy_content))
+    search_index.backend = state.search_backend
+    _schema_ready = True
+    return False
+
+
+def upgrade_and_record(fingerprint):
+    """Run the upgrade and store ``fingerprint`` as the current schema (under schema_upgrade_lock)"""
+    db.create_all()
+    upgrade_schema()
+    table = SchemaState.__table__
+    values = {
+        'fingerprint': fingerprint,
+        'search_backend': search_index.backend,
+        'legacy_content': LEGACY_CONTENT.table is not None,
+        'updated_at': datetime.utcnow(),
+    }
+    with db.engine.begin() as conn:
+        if conn.execute(table.update().where(table.c.name == 'app').values(**values)).rowcount == 0:
+            conn.execute(table.insert().values(name='app', **values))
+    print(f"🗄️ Schema upgraded ({fingerprint[:12]})")
+
+
+def add_missing_columns(table):
+    """ALTER TABLE ... ADD COLUMN for model columns the database table lacks (nullable columns only)"""
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    added = []
+    with db.engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing or column.info.get('legacy'):
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(column.name)
+    return added
+
+
+def upgrade_schema():
+    """Bring an existing database up to date with the current models"""
+    add_missing_columns(Note.__table__)
+    add_missing_columns(SchemaState.__table__)
+
+    for index in Note.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+
+    # Notes written before the change feed existed join it in id order
+    with db.engine.begin() as conn:
+        conn.execute(text('UPDATE note SET change_seq = id WHERE change_seq IS NULL'))
+        newest = conn.execute(text('SELECT COALESCE(MAX(change_seq), 0) FROM note')).scalar()
+        counters = ChangeCounter.__table__
+        current = conn.execute(db.select(counters.c.value).where(counters.c.name == 'note')).scalar()
+        if current is None:
+            conn.execute(counters.insert().values(name='note', value=newest))
+        elif current < newest:
+            conn.execute(counters.update().where(counters.c.name == 'note').values(value=newest))
+
+    with db.engine.begin() as conn:
+        conn.execute(text('UPDATE note SET version = 1 WHERE version IS NULL'))
+
+    configure_note_storage(db.engine)
+    if configure_legacy_content(has_legacy_content()):
+        # The old search index reads note.content; setup() below builds the new one
+        search_index.drop_legacy_index(db.engine)
+        move_note_bodies()
+
+    search_index.setup(db.engine)
+
+
+def has_legacy_content():
+    """True if the note table still has the body column from before note_content"""
+    return 'content' in {column['name'] for column in inspect(db.engine).get_columns('note')}
+
+
+def move_note_bodies(batch_size=500):
+    """
+    Copy bodies from the legacy note.content column into note_content. Each
+    batch is its own transaction and copied notes are skipped, so an
+    interrupted copy resumes on the next startup. Notes written before
+    content_hash existed get their hash here as well. The legacy column is
+    left in place; drop_legacy_content() removes it.
+    """
+    note = Note.__table__
+    moved = 0
+    while True:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                db.select(note.c.id, note.c.title, note.c.content_hash, note.c.content)
+                .where(~db.exists().where(NoteContent.note_id == note.c.id))
+                .order_by(note.c.id)
+                .limit(batch_size)
+            ).all()
+            if rows:
+                conn.execute(db.insert(NoteContent), [
+                    {'note_id': row.id, **NoteContent.pack(row.content)} for row in rows
+                ])
+                conn.execute(
+                    note.update().where(note.c.id == db.bindparam('b_id')).values(
+                        preview=db.bindparam('b_preview'), content_hash=db.bindparam('b_hash'),
+                        # Not an edit: keep updated_at and the legacy body instead of letting onupdate reset them
+                        updated_at=note.c.updated_at, content=note.c.content
+                    ),
+                    [{
+                        'b_id': row.id,
+                        'b_preview': Note.make_preview(row.content),
+                        'b_hash': row.content_hash or Note.compute_hash(row.title, row.content),
+                    } for row in rows]
+                )
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if moved:
+        print(f"📦 Copied {moved} note bodies into note_content; "
+              f"drop the old column with `flask --app src.main upgrade-schema --drop-legacy-content`")
+    return moved
+
+
+def legacy_content_mismatches(batch_size=500):
+    """
+    Ids of notes whose legacy note.content body is missing from note_content
+    or differs from it. Notes written since the copy have '' there and are
+    not compared.
+    """
+    note = Note.__table__
+    mismatches = []
+    last_id = 0
+    while True:
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                db.select(note.c.id, note.c.content, NoteContent.text, NoteContent.codec, NoteContent.data)
+                .outerjoin(NoteContent, NoteContent.note_id == note.c.id)
+                .where(note.c.id > last_id, note.c.content != '')
+                .order_by(note.c.id)
+                .limit(batch_size)
+            ).all()
+        for row in rows:
+            if NoteContent.unpack(row.text, row.codec, row.data) != row.content:
+                mismatches.append(row.id)
+        if len(rows) < batch_size:
+            return mismatches
+        last_id = rows[-1].id
+
+
+def drop_legacy_content():
+    """
+    Drop the legacy note.content column once every body in it is verified to
+    be in note_content. SQLite before 3.35 cannot drop columns, so there the
+    column is only emptied (and still written as ''). Returns False if there
+    was nothing to drop.
+    """
+    with schema_upgrade_lock(db.engine):
+        if not configure_legacy_content(has_legacy_content()):
+            return False
+        move_note_bodies()
+        mismatches = legacy_content_mismatches()
+        if mismatches:
+            raise ValueError(
+                f"{len(mismatches)} legacy note bodies are missing from note_content or differ from it "
+                f"(note ids {', '.join(map(str, mismatches[:10]))}); the legacy column was kept"
+            )
+
+        sqlite = db.engine.dialect.name == 'sqlite'
+        with db.engine.begin() as conn:
+            if sqlite and sqlite3.sqlite_version_info < (3, 35):
+                conn.execute(text("UPDATE note SET content = ''"))
+            else:
+                conn.execute(text('ALTER TABLE note DROP COLUMN content'))
+                conn.execute(SchemaState.__table__.update().values(legacy_content=False))
+    if sqlite:
+        # Give the pages freed by the old bodies back to the file system
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+    return True
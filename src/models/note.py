@@ -1,23 +1,136 @@
+import hashlib
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event
 from src.models.user import db
+from src.models.note_translation import NoteTranslation
+from src.models.note_content import NoteContent
+
+# Number of content characters returned in list/summary responses
+NOTE_PREVIEW_LENGTH = 200
 
 class Note(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    # Start of the content, so listings never have to load the body
+    preview = db.Column(db.String(NOTE_PREVIEW_LENGTH), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+    # Position in the change feed, assigned on every insert and update (see src/services/changes.py)
+    change_seq = db.Column(db.BigInteger, nullable=True, index=True)
+    # Bumped by every UPDATE; writes based on an older version are rejected
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # sha256 of title and content, for detecting no-op saves
+    content_hash = db.Column(db.String(64), nullable=True)
+
+    # The body lives in its own table (see NoteContent); use ``content`` to read and write it
+    body = db.relationship(NoteContent, uselist=False, cascade='all, delete-orphan')
+
+    # Stored paragraph translations, removed together with the note
+    translations = db.relationship(NoteTranslation, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Backs the keyset-paginated listing (ORDER BY updated_at DESC, id DESC)
+        db.Index('ix_note_updated_at_id', 'updated_at', 'id'),
+    )
+
+    __mapper_args__ = {
+        # UPDATE ... WHERE version = <loaded version>; a concurrent write raises StaleDataError
+        'version_id_col': version,
+    }
+
     def __repr__(self):
         return f'<Note {self.title}>'
-    
+
+    @property
+    def content(self):
+        return self.body.content if self.body is not None else None
+
+    @content.setter
+    def content(self, value):
+        if self.body is None:
+            self.body = NoteContent()
+        self.body.content = value
+        # Also marks the note row itself as changed, so the version is bumped
+        self.preview = Note.make_preview(value)
+        self.content_hash = Note.compute_hash(self.title, value)
+
     def to_dict(self):
         return {
             'id': self.id,
             'title': self.title,
             'content': self.content,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq,
+            'version': self.version,
+            'content_hash': self.content_hash
+        }
+
+    def version_dict(self):
+        """The fields a client needs to keep editing after a save"""
+        return {
+            'id': self.id,
+            'version': self.version,
+            'content_hash': self.content_hash,
+            'change_seq': self.change_seq,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    @staticmethod
+    def compute_hash(title, content):
+        """Hash identifying a note's title and content"""
+        return hashlib.sha256(f"{title or ''}\0{content or ''}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_preview(content):
+        """The stored ``preview`` of a body"""
+        return (content or '')[:NOTE_PREVIEW_LENGTH]
+
+    @classmethod
+    def summary_columns(cls):
+        """Columns selected for the summary projection (no full content)"""
+        return (
+            cls.id,
+            cls.title,
+            cls.preview,
+            cls.created_at,
+            cls.updated_at,
+            cls.change_seq,
+        )
+
+    @staticmethod
+    def summary_to_dict(row):
+        """Serialize a row selected with summary_columns()"""
+        return {
+            'id': row.id,
+            'title': row.title,
+            'preview': row.preview,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            'change_seq': row.change_seq
+        }
+
+
+# Body column of databases from before note_content (NOT NULL, without a
+# default). It stays until `flask upgrade-schema --drop-legacy-content`; until
+# then every insert and update stores '' in it, so a non-empty value is always
+# an original body that was copied to note_content.
+LEGACY_CONTENT = db.Column('content', db.Text, default='', onupdate='', info={'legacy': True})
+
+def configure_legacy_content(present):
+    """Write the legacy note.content column if the database still has it"""
+    if present and LEGACY_CONTENT.table is None:
+        Note.__table__.append_column(LEGACY_CONTENT)
+    return LEGACY_CONTENT.table is not None
+
+
+@event.listens_for(Note, 'before_insert')
+def _hash_new_note(mapper, connection, note):
+    note.content_hash = Note.compute_hash(note.title, note.content)
+
+@event.listens_for(Note.title, 'set')
+def _rehash_retitled_note(note, value, oldvalue, initiator):
+    # Content changes rehash in the ``content`` setter
+    if value != oldvalue:
+        note.content_hash = Note.compute_hash(value, note.content)
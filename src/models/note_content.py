@@ -0,0 +1,91 @@
+import os
+import zlib
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.models.user import db
+
+# Bodies of at least this many UTF-8 bytes are stored compressed (0 disables compression)
+COMPRESS_MIN_BYTES = int(os.getenv('NOTE_COMPRESS_MIN_BYTES', 2048))
+ZLIB_LEVEL = 6
+
+CODEC_ZLIB = 'zlib'
+
+# Set by configure_note_storage(); only SQLite stores compressed bodies
+_compression_enabled = False
+
+
+class NoteContent(db.Model):
+    """
+    Body of a note, kept out of the note table so that listings, sorting and
+    index scans only read titles and metadata.
+
+    Short bodies are stored as plain ``text``. On SQLite, bodies of at least
+    COMPRESS_MIN_BYTES are zlib-compressed into ``data`` instead, with
+    ``codec`` naming the compression; the ``note_body()`` SQL function
+    registered on every SQLite connection decodes either form (the search
+    index relies on it). PostgreSQL already compresses large values itself
+    (TOAST), so it always stores plain text.
+    """
+    __tablename__ = 'note_content'
+
+    note_id = db.Column(db.Integer, db.ForeignKey('note.id', ondelete='CASCADE'), primary_key=True)
+    text = db.Column(db.Text, nullable=True)
+    codec = db.Column(db.String(10), nullable=True)
+    data = db.Column(db.LargeBinary, nullable=True)
+    # Uncompressed size in UTF-8 bytes
+    size = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<NoteContent {self.note_id} {self.codec or "text"} {self.size}>'
+
+    @property
+    def content(self):
+        if self.codec is None:
+            return self.text
+        # Decompress once per loaded value
+        cached = self.__dict__.get('_decoded')
+        if cached is None or cached[0] is not self.data:
+            cached = (self.data, self.unpack(None, self.codec, self.data))
+            self._decoded = cached
+        return cached[1]
+
+    @content.setter
+    def content(self, value):
+        for key, packed in self.pack(value).items():
+            setattr(self, key, packed)
+        if self.codec is not None:
+            self._decoded = (self.data, value)
+
+    @staticmethod
+    def pack(content):
+        """Column values storing ``content``, compressed when that is enabled and worthwhile"""
+        content = content or ''
+        raw = content.encode('utf-8')
+        if _compression_enabled and COMPRESS_MIN_BYTES and len(raw) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(raw, ZLIB_LEVEL)
+            if len(compressed) < len(raw):
+                return {'text': None, 'codec': CODEC_ZLIB, 'data': compressed, 'size': len(raw)}
+        return {'text': content, 'codec': None, 'data': None, 'size': len(raw)}
+
+    @staticmethod
+    def unpack(text, codec, data):
+        """Inverse of pack()"""
+        if codec is None:
+            return text
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(data).decode('utf-8')
+        raise ValueError(f'Unknown note content codec: {codec}')
+
+
+def configure_note_storage(engine):
+    """Enable compression of new bodies where the database can decode them"""
+    global _compression_enabled
+    _compression_enabled = engine.dialect.name == 'sqlite'
+    return _compression_enabled
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('note_body', 3, NoteContent.unpack, deterministic=True)
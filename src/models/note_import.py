@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+from src.models.user import db
+
+class NoteImport(db.Model):
+    """
+    Progress of a bulk import. ``records_committed`` is updated in the same
+    transaction as each inserted batch, so a failed import can be resumed
+    from exactly where it stopped.
+    """
+    __tablename__ = 'note_import'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    source = db.Column(db.String(255), nullable=False)
+    format = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='running')
+    records_committed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NoteImport {self.id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source': self.source,
+            'format': self.format,
+            'status': self.status,
+            'records_committed': self.records_committed,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
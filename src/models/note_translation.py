@@ -0,0 +1,64 @@
+import json
+import importlib
+from datetime import datetime
+from src.models.user import db
+
+# Dialects whose insert() has on_conflict_do_update(), imported on first use
+# (the PostgreSQL dialect module alone costs tens of milliseconds of startup)
+UPSERT_DIALECTS = ('sqlite', 'postgresql')
+
+class NoteTranslation(db.Model):
+    """
+    Per-note translation memory: maps the hash of each source paragraph to
+    its translation, so re-translating an edited note only sends the
+    paragraphs that changed.
+    """
+    __tablename__ = 'note_translation'
+
+    note_id = db.Column(db.Integer, db.ForeignKey('note.id', ondelete='CASCADE'), primary_key=True)
+    target_language = db.Column(db.String(20), primary_key=True)
+    prompt_version = db.Column(db.String(40), nullable=False)
+    segments = db.Column(db.Text, nullable=False, default='{}')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NoteTranslation {self.note_id} {self.target_language}>'
+
+    @classmethod
+    def load_memo(cls, note_id, target_language, prompt_version):
+        """Return the stored {segment hash: translation} map, or {} if missing or outdated"""
+        record = db.session.get(cls, (note_id, target_language))
+        if not record or record.prompt_version != prompt_version:
+            return {}
+        try:
+            return json.loads(record.segments)
+        except ValueError:
+            return {}
+
+    @classmethod
+    def save_memo(cls, note_id, target_language, prompt_version, memo):
+        """
+        Replace the stored map (paragraphs no longer in the note are dropped).
+        An upsert, so two first translations of the same note racing to
+        create the row both succeed (the last one wins).
+        """
+        values = {
+            'prompt_version': prompt_version,
+            'segments': json.dumps(memo, ensure_ascii=False),
+            'updated_at': datetime.utcnow(),
+        }
+        dialect = db.engine.dialect.name
+        if dialect in UPSERT_DIALECTS:
+            insert = importlib.import_module(f'sqlalchemy.dialects.{dialect}').insert
+            statement = insert(cls).values(note_id=note_id, target_language=target_language, **values)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[cls.note_id, cls.target_language], set_=values
+            ))
+        else:
+            record = db.session.get(cls, (note_id, target_language))
+            if record is None:
+                record = cls(note_id=note_id, target_language=target_language)
+                db.session.add(record)
+            record.prompt_version = values['prompt_version']
+            record.segments = values['segments']
+        db.session.commit()
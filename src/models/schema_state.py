@@ -0,0 +1,21 @@
+from datetime import datetime
+from src.models.user import db
+
+class SchemaState(db.Model):
+    """
+    Fingerprint of the schema the database was last upgraded to (see
+    ensure_schema in src/models/migrations.py), so a cold start can skip the
+    upgrade with a single query.
+    """
+    __tablename__ = 'schema_state'
+
+    name = db.Column(db.String(40), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    # Search backend the upgrade ended up with ('like' if the index could not be built)
+    search_backend = db.Column(db.String(20), nullable=True)
+    # Whether the note table still has its legacy content column (see src/models/note.py)
+    legacy_content = db.Column(db.Boolean, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaState {self.name} {self.fingerprint[:12]}>'
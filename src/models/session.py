@@ -0,0 +1,95 @@
+"""
+Session class that sends the SELECTs of read-only requests to a separate
+read engine: the read-only SQLite pool (src/services/sqlite_storage.py) or
+a database replica (src/services/read_replica.py).
+
+GET and HEAD requests opt in (see init_read_routing). Only plain SELECTs
+are routed, and only until the session writes: from then on until the
+transaction ends everything uses the primary engine, so a request always
+reads its own uncommitted writes.
+
+A replica can lag behind the primary. After a request commits a write the
+client gets a cookie that keeps its reads on the primary for
+``read_your_writes_seconds``, so it sees its own changes.
+"""
+import time
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select, TextClause
+
+READ_ENGINE_EXTENSION = 'read_engine'
+READ_ROUTING_EXTENSION = 'read_routing'
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+
+def _is_plain_select(clause):
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith('SELECT')
+    return False
+
+
+class RoutingSession(Session):
+    def route_reads(self):
+        """Send this session's reads to the read engine, if the app has one"""
+        self.info['route_reads'] = True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or not _is_plain_select(clause):
+                self.info['wrote'] = True
+            elif self.info.get('route_reads') and not self.info.get('wrote'):
+                engine = current_app.extensions.get(READ_ENGINE_EXTENSION) if has_app_context() else None
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    # Committed writes are visible to the read engine from here on (or, for
+    # a replica, once it has caught up)
+    if session.info.pop('wrote', None):
+        session.info['committed_writes'] = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('wrote', None)
+
+
+def init_read_routing(app, db, engine, read_your_writes_seconds=0):
+    """
+    Route the reads of GET and HEAD requests to ``engine``. A positive
+    ``read_your_writes_seconds`` pins clients to the primary for that long
+    after each of their writes.
+    """
+    first = READ_ROUTING_EXTENSION not in app.extensions
+    app.extensions[READ_ENGINE_EXTENSION] = engine
+    app.extensions[READ_ROUTING_EXTENSION] = {'read_your_writes_seconds': read_your_writes_seconds}
+    if not first:
+        return
+
+    @app.before_request
+    def route_reads():
+        if request.method not in ('GET', 'HEAD'):
+            return
+        pinned_until = request.cookies.get(READ_PRIMARY_COOKIE)
+        try:
+            if pinned_until and float(pinned_until) > time.time():
+                return
+        except ValueError:
+            pass
+        db.session().route_reads()
+
+    @app.after_request
+    def pin_writers(response):
+        window = app.extensions[READ_ROUTING_EXTENSION]['read_your_writes_seconds']
+        if window > 0 and db.session().info.get('committed_writes'):
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, f'{time.time() + window:.3f}',
+                max_age=int(window) + 1, httponly=True, samesite='Lax'
+            )
+        return response
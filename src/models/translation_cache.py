@@ -0,0 +1,24 @@
+from datetime import datetime
+from src.models.user import db
+
+class TranslationCacheEntry(db.Model):
+    """Persistent tier of the translation cache, keyed by a content hash"""
+    __tablename__ = 'translation_cache'
+
+    key = db.Column(db.String(64), primary_key=True)
+    model = db.Column(db.String(100), nullable=False)
+    target_language = db.Column(db.String(20), nullable=False)
+    translated_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TranslationCacheEntry {self.key[:12]}>'
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'model': self.model,
+            'target_language': self.target_language,
+            'translated_text': self.translated_text,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
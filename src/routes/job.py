@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, request, url_for
+from src.models.user import db
+from src.models.job import Job
+from src.services.jobs import job_queue
+
+job_bp = Blueprint('job', __name__)
+
+@job_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a translate, auto_complete, bulk_translate or compact_tombstones job and return it at once"""
+    data = request.json or {}
+    job_type = data.get('type')
+    params = data.get('params') or {}
+    if not job_type:
+        return jsonify({'error': 'Job type is required'}), 400
+    if not isinstance(params, dict):
+        return jsonify({'error': 'Job params must be an object'}), 400
+
+    try:
+        job = job_queue.enqueue(job_type, params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = url_for('job.get_job', job_id=job.id)
+    return response, 202
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job's status; the result is included once it has finished"""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
@@ -1,24 +1,176 @@
-from flask import Blueprint, jsonify, request, make_response
+from flask import Blueprint, Response, abort, jsonify, request, make_response, stream_with_context
 import os
+import json
+import base64
+import hashlib
+import zipfile
 import traceback
+from datetime import datetime
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.orm.exc import StaleDataError
 from src.models.note import Note, db
+from src.services.translation_cache import translation_cache
+from src.services.http_client import http_client
+from src.services.search import search_index, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from src.services.concurrency import get_executor
+from src.services.changes import changes_since, current_cursor, DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT
+from src.services.text_patch import apply_splices
+from src.services.read_cache import cached_read
+from src.services.note_serializer import note_select, note_record, note_row_to_dict, json_response
 
-# Import translation service with error handling
-try:
-    from src.services.translation import translation_service
-    TRANSLATION_AVAILABLE = True
-except Exception as e:
-    print(f"Translation service not available: {e}")
-    TRANSLATION_AVAILABLE = False
-    translation_service = None
+# The translation service, and the batch, import and ZIP export services
+# below, are imported on first use to keep them off the cold-start path
+from src.services.lazy import translation_service
 
 note_bp = Blueprint('note', __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = 200
+
+# Threads rendering and compressing ZIP export entries
+EXPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+def encode_cursor(updated_at, note_id):
+    """Encode the (updated_at, id) position of the last listed note"""
+    raw = json.dumps([updated_at.isoformat() if updated_at else None, note_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, note_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(updated_at), int(note_id)
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ?limit= value, clamped to [1, maximum]"""
+    if value is None:
+        return default
+    limit = int(value)
+    return max(1, min(limit, maximum))
+
+def note_etag(note_id, version, change_seq):
+    """
+    Strong ETag of one note. The version changes with every update, and
+    change_seq tells apart a note created later under a reused id (SQLite
+    hands out a deleted max id again).
+    """
+    return f'{note_id}-{version}-{change_seq}'
+
+def collection_etag():
+    """
+    ETag of a list or search response, from the note count, the newest
+    change_seq and the query string. Any insert or update raises the newest
+    change_seq and a delete lowers the count, so the tag changes with the data.
+    """
+    count, newest = db.session.execute(select(func.count(Note.id), func.max(Note.change_seq))).one()
+    args = hashlib.sha256(request.query_string).hexdigest()[:16]
+    return f'{count}-{newest or 0}-{args}'
+
+def not_modified(etag):
+    """Empty 304 for a request whose If-None-Match matches ``etag``"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    return response
+
+def with_etag(response, etag):
+    """Tag a response; clients must revalidate before reusing it"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def if_match_failed(note):
+    """True if the request has an If-Match header that does not match ``note``"""
+    return bool(request.if_match) and not request.if_match.contains(note_etag(note.id, note.version, note.change_seq))
+
 @note_bp.route('/notes', methods=['GET'])
+@cached_read
 def get_notes():
-    """Get all notes, ordered by most recently updated"""
-    notes = Note.query.order_by(Note.updated_at.desc()).all()
-    return jsonify([note.to_dict() for note in notes])
+    """Get notes, ordered by most recently updated
+
+    Without query parameters every note is returned in full (legacy behaviour).
+    Passing ``limit``, ``cursor`` or ``view`` switches to keyset pagination on
+    (updated_at, id): the response is ``{"notes": [...], "next_cursor": ...}``
+    and, unless ``view=full`` is given, each note only carries a truncated
+    ``preview`` instead of its full content.
+    """
+    args = request.args
+    # Answer revalidations before loading any note
+    etag = collection_etag()
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    if not any(key in args for key in ('limit', 'cursor', 'view')):
+        rows = db.session.execute(note_select().order_by(Note.updated_at.desc()))
+        return with_etag(json_response([note_row_to_dict(row) for row in rows]), etag)
+
+    view = args.get('view', 'summary')
+    if view not in ('summary', 'full'):
+        return jsonify({'error': 'view must be "summary" or "full"'}), 400
+
+    try:
+        limit = parse_limit(args.get('limit'))
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Read before listing, so changes made meanwhile are picked up by the next sync
+    sync_cursor = current_cursor(db.session)
+
+    if view == 'full':
+        query = note_select()
+    else:
+        query = select(*Note.summary_columns())
+
+    if cursor:
+        cursor_updated_at, cursor_id = cursor
+        query = query.where(or_(
+            Note.updated_at < cursor_updated_at,
+            and_(Note.updated_at == cursor_updated_at, Note.id < cursor_id)
+        ))
+
+    # Fetch one extra row to find out whether another page exists
+    rows = db.session.execute(query.order_by(Note.updated_at.desc(), Note.id.desc()).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if view == 'full':
+        notes = [note_row_to_dict(row) for row in rows]
+    else:
+        notes = [Note.summary_to_dict(row) for row in rows]
+
+    next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id) if has_more else None
+    return with_etag(json_response({'notes': notes, 'next_cursor': next_cursor, 'sync_cursor': sync_cursor}), etag)
+
+@note_bp.route('/notes/changes', methods=['GET'])
+def get_note_changes():
+    """Notes created, updated or deleted since a change cursor
+
+    Pass the ``sync_cursor`` of a list response (or the ``cursor`` of the
+    previous call) as ``since``. The response has the changed notes (summary
+    view unless ``view=full``), the ids of deleted notes, the next ``cursor``
+    and ``has_more`` when there are more changes than ``limit``. ``reset``
+    means the client is too far behind and must reload its list.
+    """
+    args = request.args
+    view = args.get('view', 'summary')
+    if view not in ('summary', 'full'):
+        return jsonify({'error': 'view must be "summary" or "full"'}), 400
+
+    try:
+        since = int(args.get('since', 0))
+        limit = parse_limit(args.get('limit'), DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    if since < 0:
+        return jsonify({'error': 'since must not be negative'}), 400
+
+    return json_response(changes_since(db.session, since, limit, full=view == 'full'))
 
 @note_bp.route('/notes', methods=['POST'])
 def create_note():
@@ -37,10 +189,22 @@ def create_note():
         return jsonify({'error': str(e)}), 500
 
 @note_bp.route('/notes/<int:note_id>', methods=['GET'])
+@cached_read
 def get_note(note_id):
-    """Get a specific note by ID"""
-    note = Note.query.get_or_404(note_id)
-    return jsonify(note.to_dict())
+    """Get a specific note by ID (supports If-None-Match)"""
+    current = db.session.execute(select(Note.version, Note.change_seq).where(Note.id == note_id)).first()
+    if current is None:
+        abort(404)
+    
+    etag = note_etag(note_id, current.version, current.change_seq)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    
+    row = db.session.execute(note_select().where(Note.id == note_id)).first()
+    if row is None:
+        abort(404)
+    note = note_row_to_dict(row)
+    return with_etag(json_response(note), note_etag(note['id'], note['version'], note['change_seq']))
 
 @note_bp.route('/notes/<int:note_id>', methods=['PUT'])
 def update_note(note_id):
@@ -51,39 +215,189 @@ def update_note(note_id):
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
-        
-        note.title = data.get('title', note.title)
-        note.content = data.get('content', note.content)
-        db.session.commit()
-        return jsonify(note.to_dict())
+        if if_match_failed(note):
+            return jsonify({'error': 'Note has changed (If-Match failed)', 'version': note.version}), 412
+        
+        title = data.get('title', note.title)
+        content = data.get('content', note.content)
+        
+        # Saving identical text is a no-op: no write, no new version or updated_at
+        if Note.compute_hash(title, content) != note.content_hash:
+            note.title = title
+            note.content = content
+            db.session.commit()
+        return with_etag(jsonify(note.to_dict()), note_etag(note.id, note.version, note.change_seq))
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Note was modified concurrently, please retry'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@note_bp.route('/notes/<int:note_id>', methods=['PATCH'])
+def patch_note(note_id):
+    """Apply an edit to a note, relative to the version the client last saw
+
+    Body: ``base_version`` plus ``content_patch`` (splices, see
+    src/services/text_patch.py) or a full ``content``, and optionally
+    ``title``. A stale ``base_version`` is rejected with 409 and the current
+    version, so the client can reload or fall back to a full save. The
+    response only carries the new version, not the note.
+    """
+    data = request.json
+    if not data or not isinstance(data.get('base_version'), int):
+        return jsonify({'error': 'base_version is required'}), 400
+    
+    note = Note.query.get_or_404(note_id)
+    if note.version != data['base_version']:
+        return jsonify({
+            'error': 'Note has changed since base_version',
+            'version': note.version,
+            'content_hash': note.content_hash
+        }), 409
+    
+    title = data.get('title', note.title)
+    try:
+        if 'content_patch' in data:
+            content = apply_splices(note.content, data['content_patch'])
+        else:
+            content = data.get('content', note.content)
+    except ValueError as e:
+        return jsonify({'error': 'Invalid content_patch', 'details': str(e)}), 400
+    
+    if Note.compute_hash(title, content) == note.content_hash:
+        return with_etag(jsonify({**note.version_dict(), 'unchanged': True}), note_etag(note.id, note.version, note.change_seq))
+    
+    try:
+        note.title = title
+        note.content = content
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        current = db.session.get(Note, note_id)
+        return jsonify({
+            'error': 'Note has changed since base_version',
+            'version': current.version if current else None,
+            'content_hash': current.content_hash if current else None
+        }), 409
+    return with_etag(jsonify({**note.version_dict(), 'unchanged': False}), note_etag(note.id, note.version, note.change_seq))
+
 @note_bp.route('/notes/<int:note_id>', methods=['DELETE'])
 def delete_note(note_id):
     """Delete a specific note"""
     try:
         note = Note.query.get_or_404(note_id)
+        if if_match_failed(note):
+            return jsonify({'error': 'Note has changed (If-Match failed)', 'version': note.version}), 412
         db.session.delete(note)
         db.session.commit()
         return '', 204
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Note was modified concurrently, please retry'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@note_bp.route('/notes/batch', methods=['POST'])
+def batch_notes():
+    """Run many note operations in one request and one transaction
+
+    Body: ``operations``, a list of ``{"op": "create", "title", "content"}``,
+    ``{"op": "update", "id", "title"?, "content"?, "base_version"?}`` and
+    ``{"op": "delete", "id", "base_version"?}``; ``get``, a list of note ids
+    to return after the writes; and ``atomic`` (default true). Each operation
+    gets a result with an HTTP-style ``status``. In an atomic batch one
+    failure rolls everything back and the rest are reported as 424.
+    """
+    from src.services.note_batch import run_batch, MAX_BATCH_OPERATIONS
+
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'No data provided'}), 400
+    
+    operations = data.get('operations', [])
+    get_ids = data.get('get', [])
+    if not isinstance(operations, list) or not isinstance(get_ids, list):
+        return jsonify({'error': 'operations and get must be lists'}), 400
+    if not all(isinstance(note_id, int) for note_id in get_ids):
+        return jsonify({'error': 'get must be a list of note ids'}), 400
+    if len(operations) + len(get_ids) > MAX_BATCH_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations per batch'}), 400
+    
+    try:
+        committed, results, notes = run_batch(operations, get_ids, atomic=data.get('atomic', True))
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Notes were modified concurrently, please retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Batch failed', 'details': str(e)}), 500
+    
+    return json_response({'committed': committed, 'results': results, 'notes': notes}, 200 if committed else 400)
+
+@note_bp.route('/notes/import', methods=['POST'])
+def import_notes():
+    """Bulk-import notes from an uploaded Markdown file, ZIP archive or NDJSON file
+
+    The file comes as multipart field ``file``, or as the raw request body
+    named by ``filename`` (a raw ZIP body is copied to a temporary file
+    first). ``format`` defaults to the file extension; ``resume`` continues a failed
+    import by id, skipping the notes it already committed.
+    """
+    from src.services.note_import import import_notes as run_import, detect_format, NoteImportError, FORMATS as IMPORT_FORMATS
+
+    upload = request.files.get('file')
+    if upload is not None:
+        source, stream = upload.filename or 'upload', upload.stream
+    else:
+        source, stream = request.args.get('filename', 'upload'), request.stream
+    
+    import_format = request.args.get('format') or detect_format(source)
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': f'Invalid format. Must be one of: {", ".join(IMPORT_FORMATS)}'}), 400
+    
+    try:
+        stats = run_import(stream, import_format, source, resume=request.args.get('resume'))
+        return jsonify(stats), 201
+    except NoteImportError as e:
+        return jsonify({
+            'error': 'Import failed',
+            'details': str(e),
+            'import_id': e.note_import.id,
+            'resume_from': e.note_import.records_committed
+        }), 400 if isinstance(e.__cause__, (ValueError, zipfile.BadZipFile)) else 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 @note_bp.route('/notes/search', methods=['GET'])
+@cached_read
 def search_notes():
-    """Search notes by title or content"""
+    """Search notes by title or content, best matches first
+
+    Supports ``limit`` (default 20, max 100) and ``offset`` for paging.
+    """
     query = request.args.get('q', '')
     if not query:
         return jsonify([])
-    
-    notes = Note.query.filter(
-        (Note.title.contains(query)) | (Note.content.contains(query))
-    ).order_by(Note.updated_at.desc()).all()
-    
-    return jsonify([note.to_dict() for note in notes])
+
+    etag = collection_etag()
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    try:
+        limit = parse_limit(request.args.get('limit'), DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    note_ids = search_index.search_ids(db.session, query, limit=limit, offset=offset)
+    if not note_ids:
+        return with_etag(jsonify([]), etag)
+
+    rows = db.session.execute(note_select().where(Note.id.in_(note_ids)))
+    notes_by_id = {row.id: row for row in rows}
+    return with_etag(json_response([note_row_to_dict(notes_by_id[note_id]) for note_id in note_ids if note_id in notes_by_id]), etag)
 
 @note_bp.route('/notes/<int:note_id>/translate', methods=['POST'])
 def translate_note(note_id):
@@ -115,7 +429,7 @@ def translate_note(note_id):
                 }), 500
         
         # Original handler for local development
-        if not TRANSLATION_AVAILABLE or not translation_service:
+        if not translation_service:
             return jsonify({
                 'error': 'Translation service is not available',
                 'details': 'Translation service failed to initialize'
@@ -137,44 +451,21 @@ def translate_note(note_id):
         translate_title = data.get('translate_title', True)
         translate_content = data.get('translate_content', True)
         
+        translated = translation_service.translate_note(note, translate_title, translate_content)
+        if 'error' in translated:
+            return jsonify({
+                'error': translated['error'],
+                'details': translated['details'],
+                'errors': translated['errors']
+            }), 504 if translated['timed_out'] else 500
+        
         result = {
             'original_note': note.to_dict(),
-            'translations': {}
+            'translations': translated['translations'],
+            'incremental': translated['incremental']
         }
-        
-        # Translate title if requested
-        if translate_title and note.title:
-            try:
-                title_result = translation_service.translate_to_chinese(note.title)
-                if 'error' in title_result:
-                    return jsonify({
-                        'error': 'Title translation failed',
-                        'details': title_result['error']
-                    }), 500
-                result['translations']['title'] = title_result['translated_text']
-                result['translated_title'] = title_result['translated_text']  # Backward compatibility
-            except Exception as e:
-                return jsonify({
-                    'error': 'Title translation failed',
-                    'details': str(e)
-                }), 500
-        
-        # Translate content if requested
-        if translate_content and note.content:
-            try:
-                content_result = translation_service.translate_to_chinese(note.content)
-                if 'error' in content_result:
-                    return jsonify({
-                        'error': 'Content translation failed',
-                        'details': content_result['error']
-                    }), 500
-                result['translations']['content'] = content_result['translated_text']
-                result['translated_content'] = content_result['translated_text']  # Backward compatibility
-            except Exception as e:
-                return jsonify({
-                    'error': 'Content translation failed',
-                    'details': str(e)
-                }), 500
+        for name, translated_text in translated['translations'].items():
+            result[f'translated_{name}'] = translated_text  # Backward compatibility
         
         return jsonify(result)
         
@@ -190,7 +481,7 @@ def translate_note(note_id):
 def translate_text():
     """Translate arbitrary text from English to Chinese"""
     try:
-        if not TRANSLATION_AVAILABLE or not translation_service:
+        if not translation_service:
             return jsonify({'error': 'Translation service is not available'}), 503
             
         data = request.json
@@ -214,14 +505,16 @@ def translate_text():
 def debug_translation_status():
     """Debug endpoint to check translation service status"""
     debug_info = {
-        "translation_service_imported": TRANSLATION_AVAILABLE,
-        "translation_service_exists": translation_service is not None,
+        "translation_service_imported": bool(translation_service),
+        "translation_service_error": translation_service.error,
         "environment_variables": {
             "GITHUB_AI_TOKEN": bool(os.getenv('GITHUB_AI_TOKEN')),
             "FLASK_ENV": os.getenv('FLASK_ENV', 'not_set')
         },
         "requests_available": False,
-        "service_configured": False
+        "service_configured": False,
+        "cache": translation_cache.stats(),
+        "http_client": http_client.stats()
     }
     
     # Test requests import
@@ -233,7 +526,7 @@ def debug_translation_status():
         debug_info["requests_import_error"] = str(e)
     
     # Test translation service
-    if TRANSLATION_AVAILABLE and translation_service:
+    if translation_service:
         try:
             debug_info["service_configured"] = translation_service.is_configured()
             debug_info["service_token_exists"] = translation_service.token is not None
@@ -264,7 +557,7 @@ def auto_complete_note():
             }), 400
         
         # Check if translation service is available
-        if not TRANSLATION_AVAILABLE:
+        if not translation_service:
             return jsonify({
                 'error': 'Auto-completion service is not available'
             }), 503
@@ -313,7 +606,7 @@ def auto_complete_existing_note(note_id):
             }), 400
         
         # Check if translation service is available
-        if not TRANSLATION_AVAILABLE:
+        if not translation_service:
             return jsonify({
                 'error': 'Auto-completion service is not available'
             }), 503
@@ -357,9 +650,7 @@ def export_note(note_id):
         markdown_content = generate_note_markdown(note)
         
         # Create safe filename
-        safe_title = "".join(c for c in (note.title or "untitled") if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title.replace(' ', '_')[:50]  # Limit length
-        filename = f"{safe_title}.md"
+        filename = f"{safe_filename(note.title)}.md"
         
         # Return file as download
         response = make_response(markdown_content)
@@ -376,23 +667,58 @@ def export_note(note_id):
 
 @note_bp.route('/notes/export-all', methods=['GET'])
 def export_all_notes():
-    """Export all notes as a single Markdown file or ZIP archive"""
+    """Export all notes as a single Markdown file or ZIP archive
+
+    The Markdown is streamed: the table of contents comes from a title-only
+    query and the notes are then read and rendered in batches, so memory use
+    does not grow with the number of notes.
+
+    With ``?format=zip`` every note becomes its own Markdown file inside a
+    ZIP archive that is likewise streamed as it is built.
+    """
     try:
-        notes = Note.query.order_by(Note.created_at.desc()).all()
+        export_format = request.args.get('format', 'markdown')
+        if export_format not in ('markdown', 'zip'):
+            return jsonify({'error': 'Invalid format. Must be one of: markdown, zip'}), 400
         
-        if not notes:
-            return jsonify({'error': 'No notes to export'}), 404
+        total = db.session.query(func.count(Note.id)).scalar()
         
-        # Generate combined Markdown content
-        markdown_content = generate_all_notes_markdown(notes)
+        if not total:
+            return jsonify({'error': 'No notes to export'}), 404
         
         # Create filename with timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        order = (Note.created_at.desc(), Note.id.desc())
+        
+        if export_format == 'zip':
+            response = Response(stream_with_context(generate_notes_zip(order)), mimetype='application/zip')
+            response.headers['Content-Disposition'] = f'attachment; filename="all_notes_{timestamp}.zip"'
+            return response
+        
         filename = f"all_notes_{timestamp}.md"
         
-        # Return file as download
-        response = make_response(markdown_content)
+        def generate():
+            titles = db.session.execute(
+                select(Note.title).order_by(*order).execution_options(yield_per=EXPORT_BATCH_SIZE)
+            ).scalars()
+            
+            def notes():
+                # Only queried once the table of contents has been sent
+                rows = db.session.execute(
+                    note_select()
+                    .order_by(*order)
+                    .execution_options(yield_per=EXPORT_BATCH_SIZE)
+                )
+                for row in rows:
+                    yield note_record(row)
+            
+            for piece in iter_all_notes_markdown(titles, notes(), total):
+                yield piece.encode('utf-8')
+        
+        # Return file as download, streamed as it is rendered
+        response = Response(stream_with_context(generate()), mimetype='text/markdown')
         response.headers['Content-Type'] = 'text/markdown; charset=utf-8'
         response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
         
@@ -404,6 +730,46 @@ def export_all_notes():
             'details': str(e)
         }), 500
 
+def safe_filename(title):
+    """Filesystem-safe file name (without extension) derived from a note title"""
+    safe_title = "".join(c for c in (title or "untitled") if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    safe_title = safe_title.replace(' ', '_')[:50]  # Limit length
+    return safe_title or "untitled"
+
+def generate_notes_zip(order):
+    """
+    Yield a ZIP archive with one Markdown file per note.
+
+    Rows are read in batches in the request thread, while rendering and
+    compression run on a thread pool; see src/services/zip_stream.py.
+    """
+    from src.services.zip_stream import stream_zip
+
+    rows = db.session.execute(
+        note_select()
+        .order_by(*order)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    
+    def files():
+        used_names = set()
+        for row in rows:
+            note = note_record(row)
+            # Notes with the same safe title get their id appended
+            base = safe_filename(note.title)
+            name = f"{base}.md"
+            if name.lower() in used_names:
+                name = f"{base}_{note.id}.md"
+            suffix = 2
+            while name.lower() in used_names:
+                name = f"{base}_{note.id}_{suffix}.md"
+                suffix += 1
+            used_names.add(name.lower())
+            yield name, note.updated_at or note.created_at, lambda note=note: generate_note_markdown(note).encode('utf-8')
+    
+    executor = get_executor('export', EXPORT_WORKERS)
+    yield from stream_zip(files(), executor, window=2 * EXPORT_WORKERS)
+
 def generate_note_markdown(note):
     """Convert a note to Markdown format"""
     from datetime import datetime
@@ -446,49 +812,63 @@ def generate_note_markdown(note):
 
 def generate_all_notes_markdown(notes):
     """Convert all notes to a combined Markdown format"""
+    notes = list(notes)
+    return ''.join(iter_all_notes_markdown((note.title for note in notes), notes, len(notes)))
+
+def iter_all_notes_markdown(titles, notes, total):
+    """
+    Yield the combined Markdown export piece by piece.
+
+    ``titles`` and ``notes`` are iterables in the same order (``notes`` only
+    needs id, title, content, created_at and updated_at attributes), so both
+    can be streamed from the database.
+    """
     from datetime import datetime
     
-    # Start with document header
-    markdown = f"# All Notes Export\n\n"
-    markdown += f"*Exported from NoteTaker on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
-    markdown += f"**Total Notes:** {len(notes)}\n\n"
-    markdown += "---\n\n"
+    # Document header
+    yield (
+        f"# All Notes Export\n\n"
+        f"*Exported from NoteTaker on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
+        f"**Total Notes:** {total}\n\n"
+        "---\n\n"
+        "## Table of Contents\n\n"
+    )
     
-    # Add table of contents
-    markdown += "## Table of Contents\n\n"
-    for i, note in enumerate(notes, 1):
-        title = note.title or 'Untitled'
+    # Table of contents, in batches of lines
+    lines = []
+    for i, title in enumerate(titles, 1):
+        title = title or 'Untitled'
         # Create anchor link (lowercase, spaces to hyphens, remove special chars)
         anchor = title.lower().replace(' ', '-')
         anchor = ''.join(c for c in anchor if c.isalnum() or c == '-')
-        markdown += f"{i}. [{title}](#{anchor})\n"
-    markdown += "\n---\n\n"
+        lines.append(f"{i}. [{title}](#{anchor})\n")
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield ''.join(lines)
+            lines.clear()
+    lines.append("\n---\n\n")
+    yield ''.join(lines)
     
-    # Add each note
+    # Each note
     for i, note in enumerate(notes, 1):
-        # Note header
-        markdown += f"## {i}. {note.title or 'Untitled'}\n\n"
-        
-        # Note metadata
-        markdown += f"**ID:** {note.id}  \n"
+        # Note header and metadata
+        section = [f"## {i}. {note.title or 'Untitled'}\n\n", f"**ID:** {note.id}  \n"]
         if note.created_at:
-            markdown += f"**Created:** {note.created_at.strftime('%Y-%m-%d %H:%M:%S')}  \n"
+            section.append(f"**Created:** {note.created_at.strftime('%Y-%m-%d %H:%M:%S')}  \n")
         if note.updated_at:
-            markdown += f"**Updated:** {note.updated_at.strftime('%Y-%m-%d %H:%M:%S')}  \n"
-        markdown += "\n"
+            section.append(f"**Updated:** {note.updated_at.strftime('%Y-%m-%d %H:%M:%S')}  \n")
+        section.append("\n")
         
         # Note content
         if note.content:
-            content = note.content.strip()
-            markdown += content + "\n\n"
+            section.append(note.content.strip() + "\n\n")
         else:
-            markdown += "*No content*\n\n"
+            section.append("*No content*\n\n")
         
         # Separator between notes
-        if i < len(notes):
-            markdown += "---\n\n"
-    
-    return markdown
+        if i < total:
+            section.append("---\n\n")
+        
+        yield ''.join(section)
 
 @note_bp.route('/test/vercel-translation/<int:note_id>', methods=['POST'])
 def test_vercel_translation(note_id):
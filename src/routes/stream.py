@@ -0,0 +1,130 @@
+"""
+Server-Sent Events variants of the translation and auto-complete endpoints.
+
+Each endpoint relays model output to the browser as it is generated:
+
+    event: token   data: {"part": "content", "text": "..."}
+    event: done    data: {...same body as the non-streaming endpoint...}
+    event: error   data: {"error": "...", "part": "content"}
+"""
+import json
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.models.note import Note
+from src.models.note_translation import NoteTranslation
+from src.services.lazy import translation_service
+
+stream_bp = Blueprint('stream', __name__)
+
+VALID_COMPLETION_TYPES = ['suggestions', 'corrections', 'continuation']
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def sse_response(events):
+    """Stream a generator of SSE strings, disabling proxy buffering"""
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def note_translation_body(translations):
+    """Final body for note translations, with the keys of the non-streaming endpoint"""
+    body = {'translations': translations}
+    for name, translated_text in translations.items():
+        body[f'translated_{name}'] = translated_text
+    return body
+
+def stream_parts(parts, done_body=note_translation_body, memo=None, on_complete=None):
+    """
+    Translate each part in order, relaying tokens; ends with a done or error event.
+    ``on_complete`` receives the paragraph memo of a fully successful run.
+    """
+    translations = {}
+    memo_out = {}
+    for name, text in parts.items():
+        pieces = []
+        try:
+            for delta in translation_service.stream_document(text, memo=memo, memo_out=memo_out):
+                pieces.append(delta)
+                yield sse_event('token', {'part': name, 'text': delta})
+        except Exception as e:
+            yield sse_event('error', {'error': f'{name.capitalize()} translation failed', 'details': str(e), 'part': name})
+            return
+        translations[name] = ''.join(pieces).strip()
+
+    if on_complete:
+        on_complete(memo_out)
+    yield sse_event('done', done_body(translations))
+
+@stream_bp.route('/translate/stream', methods=['POST'])
+def stream_translate_text():
+    """Stream the Chinese translation of arbitrary text"""
+    if not translation_service:
+        return jsonify({'error': 'Translation service is not available'}), 503
+
+    data = request.json
+    if not data or not data.get('text'):
+        return jsonify({'error': 'Text is required for translation'}), 400
+    if data.get('target_language', 'chinese').lower() not in ['chinese', 'zh', 'cn']:
+        return jsonify({'error': f"Translation to {data['target_language']} is not supported yet"}), 400
+
+    events = stream_parts({'text': data['text']}, lambda translations: {'translated_text': translations['text']})
+    return sse_response(events)
+
+@stream_bp.route('/notes/<int:note_id>/translate/stream', methods=['POST'])
+def stream_translate_note(note_id):
+    """Stream the Chinese translation of a note's title, then its content"""
+    if not translation_service:
+        return jsonify({'error': 'Translation service is not available'}), 503
+
+    note = Note.query.get_or_404(note_id)
+    data = request.json or {}
+
+    parts = {}
+    if data.get('translate_title', True) and note.title:
+        parts['title'] = note.title
+    if data.get('translate_content', True) and note.content:
+        parts['content'] = note.content
+
+    # Reuse and update the note's paragraph translations, like the non-streaming endpoint
+    from src.services.translation import TRANSLATION_PROMPT_VERSION
+    memo = NoteTranslation.load_memo(note.id, 'chinese', TRANSLATION_PROMPT_VERSION)
+
+    def save_memo(new_memo):
+        if new_memo != memo:
+            NoteTranslation.save_memo(note.id, 'chinese', TRANSLATION_PROMPT_VERSION, new_memo)
+
+    return sse_response(stream_parts(parts, memo=memo, on_complete=save_memo))
+
+@stream_bp.route('/auto-complete/stream', methods=['POST'])
+def stream_auto_complete():
+    """Stream AI auto-completion for the given title and content"""
+    if not translation_service:
+        return jsonify({'error': 'Auto-completion service is not available'}), 503
+
+    data = request.json or {}
+    title = data.get('title', '').strip()
+    content = data.get('content', '').strip()
+    completion_type = data.get('type', 'suggestions')
+
+    if completion_type not in VALID_COMPLETION_TYPES:
+        return jsonify({
+            'error': f'Invalid completion type. Must be one of: {", ".join(VALID_COMPLETION_TYPES)}'
+        }), 400
+    if not title and not content:
+        return jsonify({'error': 'Please provide either a title or content to work with'}), 400
+
+    def events():
+        pieces = []
+        try:
+            for delta in translation_service.stream_auto_complete(title, content, completion_type):
+                pieces.append(delta)
+                yield sse_event('token', {'part': 'result', 'text': delta})
+        except Exception as e:
+            yield sse_event('error', {'error': 'Auto-completion failed', 'details': str(e)})
+            return
+        ai_response = ''.join(pieces).strip()
+        yield sse_event('done', translation_service.auto_complete_result(ai_response, completion_type))
+
+    return sse_response(events())
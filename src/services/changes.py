@@ -0,0 +1,143 @@
+"""
+Change feed for incremental client sync.
+
+Every insert or update of a note stamps it with the next value of a
+monotonic counter (``note.change_seq``); deleting a note leaves a tombstone
+stamped the same way. A client remembers the highest value it has seen and
+asks GET /api/notes/changes?since=<cursor> for everything after it, so a
+refresh costs O(changes) instead of O(notes).
+
+ORM writes are stamped automatically by a before_flush hook. Code that
+writes notes with Core statements (bulk import) must allocate values with
+ChangeCounter.allocate itself.
+
+Tombstones older than NOTE_TOMBSTONE_RETENTION_DAYS are compacted away on a
+schedule, by ``flask --app src.main compact-tombstones`` or a
+``compact_tombstones`` job (never by a read request). A client whose cursor
+is older than the newest compacted tombstone could miss deletions, so it is
+told to reset and reload its list.
+"""
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, delete, func
+from sqlalchemy.orm import Session
+from src.models.note import Note
+from src.models.change_log import ChangeCounter, NoteTombstone
+from src.services.note_serializer import note_select, note_row_to_dict
+
+NOTE_COUNTER = 'note'
+COMPACTED_COUNTER = 'note_tombstones_compacted'
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 2000
+
+TOMBSTONE_RETENTION_DAYS = float(os.getenv('NOTE_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+@event.listens_for(Session, 'before_flush')
+def stamp_note_changes(session, flush_context, instances):
+    """Give new and modified notes a change_seq and record deletions as tombstones"""
+    changed = [obj for obj in session.new if isinstance(obj, Note)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, Note) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Note)]
+    if not changed and not deleted:
+        return
+
+    seq = ChangeCounter.allocate(session.connection(), NOTE_COUNTER, len(changed) + len(deleted))
+    for note in changed:
+        note.change_seq = seq
+        seq += 1
+
+    now = datetime.utcnow()
+    with session.no_autoflush:
+        for note in deleted:
+            tombstone = session.get(NoteTombstone, note.id)
+            if tombstone is None:
+                session.add(NoteTombstone(note_id=note.id, change_seq=seq, deleted_at=now))
+            else:
+                tombstone.change_seq = seq
+                tombstone.deleted_at = now
+            seq += 1
+
+
+def current_cursor(session):
+    """The newest change_seq handed out so far"""
+    return ChangeCounter.current(session, NOTE_COUNTER)
+
+
+def changes_since(session, since, limit=DEFAULT_CHANGES_LIMIT, full=False):
+    """
+    Notes changed and deleted after ``since``, oldest change first.
+
+    Returns {"notes", "deleted", "cursor", "has_more", "reset"}. ``cursor`` is
+    the value to pass as ``since`` next time. ``reset`` means tombstones the
+    client needed were compacted, so it must reload from since=0.
+    """
+    if since > 0 and since < ChangeCounter.current(session, COMPACTED_COUNTER):
+        return {'notes': [], 'deleted': [], 'cursor': 0, 'has_more': False, 'reset': True}
+
+    if full:
+        note_rows = session.execute(
+            note_select().where(Note.change_seq > since).order_by(Note.change_seq).limit(limit + 1)
+        ).all()
+    else:
+        note_rows = session.query(*Note.summary_columns()).filter(
+            Note.change_seq > since
+        ).order_by(Note.change_seq).limit(limit + 1).all()
+
+    # A full load (since=0) only needs the notes that exist
+    tombstones = []
+    if since > 0:
+        tombstones = session.query(NoteTombstone).filter(
+            NoteTombstone.change_seq > since
+        ).order_by(NoteTombstone.change_seq).limit(limit + 1).all()
+
+    # Merge both streams by change_seq and keep the first ``limit`` changes
+    merged = sorted(
+        [(row.change_seq, 'note', row) for row in note_rows] +
+        [(tombstone.change_seq, 'deleted', tombstone) for tombstone in tombstones],
+        key=lambda change: change[0]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    notes, deleted = [], []
+    for _, kind, row in merged:
+        if kind == 'deleted':
+            deleted.append(row.note_id)
+        elif full:
+            notes.append(note_row_to_dict(row))
+        else:
+            notes.append(Note.summary_to_dict(row))
+
+    if merged:
+        cursor = merged[-1][0]
+    else:
+        # Nothing newer than ``since``: jump to the current position
+        cursor = max(since, current_cursor(session))
+
+    return {'notes': notes, 'deleted': deleted, 'cursor': cursor, 'has_more': has_more, 'reset': False}
+
+
+def compact_tombstones(session, retention_days=TOMBSTONE_RETENTION_DAYS):
+    """Delete tombstones older than the retention period; returns how many were removed"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    newest = session.execute(
+        select(func.max(NoteTombstone.change_seq)).where(NoteTombstone.deleted_at < cutoff)
+    ).scalar()
+    if newest is None:
+        return 0
+
+    removed = session.execute(delete(NoteTombstone).where(NoteTombstone.change_seq <= newest)).rowcount
+    counter = session.get(ChangeCounter, COMPACTED_COUNTER)
+    if counter is None:
+        session.add(ChangeCounter(name=COMPACTED_COUNTER, value=newest))
+    elif counter.value < newest:
+        counter.value = newest
+    session.commit()
+    print(f"🧹 Compacted {removed} note tombstone(s) up to change {newest}")
+    return removed
+
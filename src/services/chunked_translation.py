@@ -0,0 +1,240 @@
+"""
+Chunked translation of long Markdown notes.
+
+A note is split into segments along its Markdown structure: fenced code
+blocks, headings and paragraphs. Blank lines and code fences are kept as
+non-translatable segments. Paragraphs longer than the chunk size are split
+further at line, sentence or word boundaries. The translatable segments are
+sent to the model concurrently and the results are joined back in order, so
+joining the segments always reproduces the original layout.
+
+Texts at or under the chunk size that contain no code fence are sent as a
+single chunk, exactly as before.
+
+Callers can pass a translation memory (segment hash -> translation) to
+translate_chunked; segments found in it are reused instead of being sent to
+the model, which makes re-translating a lightly edited note cheap.
+"""
+import os
+import re
+import hashlib
+from collections import namedtuple
+from src.services.concurrency import run_concurrently, DeadlineExceeded
+from src.services.translation_cache import normalize_text
+
+# Largest piece of text sent to the model in one request
+DEFAULT_CHUNK_CHARS = int(os.getenv('TRANSLATION_CHUNK_CHARS', 2000))
+
+# Output budget per request: roughly one token per source character, within sane bounds
+MIN_MAX_TOKENS = 500
+MAX_MAX_TOKENS = 4096
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+FENCE_ANYWHERE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})', re.M)
+HEADING_RE = re.compile(r'^ {0,3}#{1,6}(\s|$)')
+
+# Progressively finer places to split an oversized paragraph
+SPLIT_PATTERNS = [
+    re.compile(r'(\n+)'),
+    re.compile(r'(?<=[.!?;:])(\s+)'),
+    re.compile(r'(\s+)'),
+]
+
+Segment = namedtuple('Segment', ['text', 'translatable'])
+
+
+def max_tokens_for(text):
+    """Completion token budget for translating ``text``"""
+    return max(MIN_MAX_TOKENS, min(MAX_MAX_TOKENS, len(text)))
+
+
+def segment_hash(text):
+    """Key of a source segment in a translation memory"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def split_markdown(text, max_chars=DEFAULT_CHUNK_CHARS, whole_if_short=True):
+    """
+    Split Markdown into Segments whose texts concatenate back to ``text``.
+    Code blocks and whitespace are marked non-translatable.
+
+    With ``whole_if_short`` a short, code-free text is returned as one segment;
+    otherwise it is always split per paragraph.
+    """
+    if whole_if_short and len(text) <= max_chars and not FENCE_ANYWHERE_RE.search(text):
+        return [Segment(text, True)]
+
+    segments = []
+    paragraph = []
+    lines = text.splitlines(keepends=True)
+    i = 0
+
+    def flush_paragraph():
+        if paragraph:
+            segments.extend(_split_block(''.join(paragraph), max_chars))
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        fence = FENCE_RE.match(line)
+        if fence:
+            flush_paragraph()
+            marker = fence.group(1)
+            block = [line]
+            i += 1
+            while i < len(lines):
+                block.append(lines[i])
+                closing = lines[i].strip()
+                i += 1
+                if len(closing) >= len(marker) and set(closing) == {marker[0]}:
+                    break
+            segments.append(Segment(''.join(block), False))
+        elif not line.strip():
+            flush_paragraph()
+            segments.append(Segment(line, False))
+            i += 1
+        elif HEADING_RE.match(line):
+            flush_paragraph()
+            segments.extend(_split_block(line, max_chars))
+            i += 1
+        else:
+            paragraph.append(line)
+            i += 1
+    flush_paragraph()
+
+    return _merge_separators(segments)
+
+
+def _split_block(block, max_chars):
+    """Split one paragraph or heading into translatable text plus its trailing whitespace"""
+    body = block.rstrip()
+    trailing = block[len(body):]
+    segments = _split_long(body, max_chars, 0) if len(body) > max_chars else [Segment(body, True)]
+    if trailing:
+        segments.append(Segment(trailing, False))
+    return segments
+
+
+def _split_long(text, max_chars, level):
+    """Greedily pack pieces of ``text`` into translatable segments of at most max_chars"""
+    if level >= len(SPLIT_PATTERNS):
+        return [Segment(text[i:i + max_chars], True) for i in range(0, len(text), max_chars)]
+
+    # re.split with a capturing group alternates [piece, separator, piece, ...]
+    parts = SPLIT_PATTERNS[level].split(text)
+    if len(parts) == 1:
+        return _split_long(text, max_chars, level + 1)
+
+    segments = []
+    current = ''
+    pending_separator = ''
+    for index in range(0, len(parts), 2):
+        piece = parts[index]
+        if len(piece) > max_chars:
+            if current:
+                segments.append(Segment(current, True))
+            if pending_separator:
+                segments.append(Segment(pending_separator, False))
+            segments.extend(_split_long(piece, max_chars, level + 1))
+            current = ''
+        elif current and len(current) + len(pending_separator) + len(piece) <= max_chars:
+            current += pending_separator + piece
+        else:
+            if current:
+                segments.append(Segment(current, True))
+            if pending_separator:
+                segments.append(Segment(pending_separator, False))
+            current = piece
+        pending_separator = parts[index + 1] if index + 1 < len(parts) else ''
+    if current:
+        segments.append(Segment(current, True))
+    return segments
+
+
+def _merge_separators(segments):
+    """Join runs of adjacent non-translatable segments"""
+    merged = []
+    for segment in segments:
+        if not segment.text:
+            continue
+        if segment.translatable and not segment.text.strip():
+            segment = Segment(segment.text, False)
+        if merged and not segment.translatable and not merged[-1].translatable:
+            merged[-1] = Segment(merged[-1].text + segment.text, False)
+        else:
+            merged.append(segment)
+    return merged
+
+
+def translate_chunked(parts, translate_fn, executor, deadline=None, max_chars=DEFAULT_CHUNK_CHARS, memo=None):
+    """
+    Translate several texts chunk by chunk, all chunks sharing one bounded executor.
+
+    Args:
+        parts: dict of part name -> text
+        translate_fn: callable(text) returning {"translated_text": ...} or {"error": ...}
+        executor: executor the chunks are submitted to
+        deadline: overall time budget in seconds
+        memo: optional translation memory (segment hash -> translation). When
+            given, texts are split per paragraph and known paragraphs are reused.
+
+    Returns a dict of part name -> {"translated_text", "chunks", "cached_chunks",
+    "reused_chunks", "memo"} where "memo" maps the part's segment hashes to their
+    translations, or {"error": ...} (plus "timed_out") for parts where any chunk failed.
+    """
+    whole_if_short = memo is None
+    memo = memo or {}
+    segments_by_part = {
+        name: split_markdown(text, max_chars, whole_if_short) for name, text in parts.items()
+    }
+
+    tasks = {}
+    for name, segments in segments_by_part.items():
+        for index, segment in enumerate(segments):
+            if segment.translatable and segment_hash(segment.text) not in memo:
+                tasks[(name, index)] = lambda text=segment.text: translate_fn(text)
+
+    outcomes = run_concurrently(tasks, executor, deadline) if tasks else {}
+
+    results = {}
+    for name, segments in segments_by_part.items():
+        pieces = []
+        part_memo = {}
+        error = None
+        cached_chunks = 0
+        reused_chunks = 0
+        for index, segment in enumerate(segments):
+            if not segment.translatable:
+                pieces.append(segment.text)
+                continue
+            key = segment_hash(segment.text)
+            if (name, index) not in outcomes:
+                reused_chunks += 1
+                part_memo[key] = memo[key]
+                pieces.append(memo[key])
+                continue
+            outcome, exception = outcomes[(name, index)]
+            if isinstance(exception, DeadlineExceeded):
+                error = {"error": f"Translation timed out after {deadline:g}s", "timed_out": True}
+                break
+            if exception is not None:
+                error = {"error": f"Translation failed: {exception}"}
+                break
+            if 'error' in outcome:
+                error = {"error": outcome['error']}
+                break
+            cached_chunks += 1 if outcome.get('cached') else 0
+            part_memo[key] = outcome['translated_text']
+            pieces.append(outcome['translated_text'])
+
+        if error:
+            results[name] = error
+        else:
+            results[name] = {
+                "translated_text": ''.join(pieces),
+                "chunks": sum(1 for segment in segments if segment.translatable),
+                "cached_chunks": cached_chunks,
+                "reused_chunks": reused_chunks,
+                "memo": part_memo
+            }
+    return results
@@ -0,0 +1,87 @@
+"""
+Helpers for running independent, I/O-bound work (LLM calls) concurrently on a
+bounded thread pool.
+
+Work submitted from inside a request keeps access to the Flask app (and so to
+the database session) because each task runs inside its own app context.
+"""
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app, has_app_context
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    """Raised for tasks that had not finished when the deadline passed"""
+
+
+def get_executor(name, max_workers):
+    """Return the process-wide executor called ``name``, creating it on first use"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            _executors[name] = executor
+        return executor
+
+
+def _with_app_context(fn):
+    """Wrap fn so it runs in the caller's app context and contextvars"""
+    context = contextvars.copy_context()
+    if not has_app_context():
+        return lambda: context.run(fn)
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return fn()
+    return lambda: context.run(run)
+
+
+def submit_in_context(executor, fn):
+    """Submit a zero-argument callable that runs in the caller's app context"""
+    return executor.submit(_with_app_context(fn))
+
+
+def run_concurrently(tasks, executor, deadline=None):
+    """
+    Run a dict of ``name -> zero-argument callable`` on ``executor``.
+
+    Returns ``name -> (result, exception)`` in the order of ``tasks``. Tasks
+    still running after ``deadline`` seconds get a DeadlineExceeded exception;
+    they keep running in the background but their results are discarded.
+    A single task runs inline, since there is nothing to overlap it with.
+    """
+    if len(tasks) == 1 and deadline is None:
+        name, fn = next(iter(tasks.items()))
+        try:
+            return {name: (fn(), None)}
+        except Exception as e:
+            return {name: (None, e)}
+
+    started = time.monotonic()
+    futures = {name: submit_in_context(executor, fn) for name, fn in tasks.items()}
+    wait(futures.values(), timeout=deadline)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            elapsed = time.monotonic() - started
+            results[name] = (None, DeadlineExceeded(f"{name} did not finish within {elapsed:.1f}s"))
+        elif future.exception() is not None:
+            results[name] = (None, future.exception())
+        else:
+            results[name] = (future.result(), None)
+    return results
+
+
+def default_workers():
+    """Max concurrent LLM calls per process (TRANSLATION_MAX_WORKERS, default 8)"""
+    return int(os.getenv('TRANSLATION_MAX_WORKERS', 8))
@@ -0,0 +1,149 @@
+"""
+Shared outbound HTTP client for LLM calls.
+
+One requests.Session per process keeps TCP/TLS connections to the model
+endpoint alive between calls, so only the first request pays for DNS, the
+connect and the TLS handshake. requests itself is imported with the
+session, on the first call. Configuration (environment variables):
+
+    LLM_HTTP_POOL_CONNECTIONS  number of per-host pools to keep (default 4)
+    LLM_HTTP_POOL_SIZE         max connections per host (default 10)
+    LLM_HTTP_POOL_BLOCK        wait for a free connection instead of opening
+                               extra, unpooled ones (default 1)
+    LLM_HTTP_CONNECT_TIMEOUT   seconds to establish a connection (default 5)
+    LLM_HTTP_READ_TIMEOUT      seconds to wait for response data (default 30)
+    LLM_HTTP_CONNECT_RETRIES   retries for failed connects only (default 2)
+"""
+import os
+import time
+import threading
+from src.services.request_timing import timed, current_timings
+from src.services.metrics import record_llm_call
+
+
+class HttpClient:
+    def __init__(self):
+        self.pool_connections = int(os.getenv('LLM_HTTP_POOL_CONNECTIONS', 4))
+        self.pool_size = int(os.getenv('LLM_HTTP_POOL_SIZE', 10))
+        self.pool_block = os.getenv('LLM_HTTP_POOL_BLOCK', '1') != '0'
+        self.connect_timeout = float(os.getenv('LLM_HTTP_CONNECT_TIMEOUT', 5))
+        self.read_timeout = float(os.getenv('LLM_HTTP_READ_TIMEOUT', 30))
+        self.connect_retries = int(os.getenv('LLM_HTTP_CONNECT_RETRIES', 2))
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        # Imported here: requests is the largest import on the cold-start path
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Only connection failures are retried: the request never reached the
+        # server, so retrying a POST cannot duplicate work
+        retry = Retry(total=None, connect=self.connect_retries, read=0, status=0,
+                      other=0, backoff_factor=0.2, allowed_methods=None)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_block,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def timeout(self, read_timeout=None):
+        """(connect, read) timeout tuple, optionally overriding the read timeout"""
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def post(self, url, headers=None, json=None, read_timeout=None, stream=False, operation=None):
+        """
+        POST through the shared pool with separate connect/read timeouts.
+        ``operation`` labels the call in the metrics (see src/services/metrics.py).
+        A ``stream`` call is timed until the caller closes the response, so
+        its duration covers the whole body, like that of any other call.
+        """
+        if stream:
+            return self._post_streamed(url, headers, json, read_timeout, operation)
+        started = time.perf_counter()
+        try:
+            with timed('llm'):
+                response = self.session.post(
+                    url,
+                    headers=headers,
+                    json=json,
+                    timeout=self.timeout(read_timeout),
+                    stream=stream
+                )
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, type(e).__name__)
+            raise
+        error = f'status_{response.status_code}' if response.status_code >= 400 else None
+        record_llm_call(operation, time.perf_counter() - started, error)
+        return response
+
+    def _post_streamed(self, url, headers, json, read_timeout, operation):
+        timings = current_timings()
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                url,
+                headers=headers,
+                json=json,
+                timeout=self.timeout(read_timeout),
+                stream=True
+            )
+        except Exception as e:
+            self._record_streamed(timings, operation, started, type(e).__name__)
+            raise
+        error = f'status_{response.status_code}' if response.status_code >= 400 else None
+        close = response.close
+        closed = False
+
+        def close_and_record():
+            nonlocal closed
+            close()
+            if not closed:
+                closed = True
+                self._record_streamed(timings, operation, started, error)
+
+        response.close = close_and_record
+        return response
+
+    @staticmethod
+    def _record_streamed(timings, operation, started, error):
+        elapsed = time.perf_counter() - started
+        if timings is not None:
+            timings.add('llm', elapsed)
+        record_llm_call(operation, elapsed, error)
+
+    def close(self):
+        """Close pooled connections (a new session is created on next use)"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def stats(self):
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_size': self.pool_size,
+            'pool_block': self.pool_block,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'session_open': self._session is not None
+        }
+
+
+# Create a global instance
+http_client = HttpClient()
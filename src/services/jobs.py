@@ -0,0 +1,293 @@
+"""
+Background job queue for slow LLM work.
+
+API requests enqueue a job and get its id back at once; a bounded pool of
+worker threads runs the job and stores its result on the job row, where
+clients poll it via GET /api/jobs/<id>. Because jobs live in the database
+they survive restarts: on startup queued jobs are picked up again and jobs
+left running by a dead process are retried.
+
+A job is claimed with a conditional UPDATE (queued -> running), so several
+processes sharing one database never run the same job twice. Setting
+JOB_WORKERS=0 disables the in-process workers; jobs are then only run by
+``flask --app src.main run-jobs`` (e.g. from a cron or worker process,
+which is the reliable option on serverless hosts that freeze background
+threads once the response is sent).
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models.user import db
+from src.models.note import Note
+from src.models.job import Job, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from src.services.concurrency import get_executor
+
+# Concurrent jobs per process (each job may itself fan out on the translate pool)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+
+# Time budget of a single job; much longer than a request can wait
+JOB_DEADLINE_SECONDS = float(os.getenv('JOB_DEADLINE_SECONDS', 600))
+
+# A running job whose process has not finished it after this long is considered abandoned
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', JOB_DEADLINE_SECONDS + 60))
+
+# Attempts before an abandoned job is marked failed instead of retried
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+VALID_COMPLETION_TYPES = ['suggestions', 'corrections', 'continuation']
+
+
+class JobQueue:
+    """Durable job queue backed by the job table and a bounded thread pool"""
+
+    def __init__(self):
+        self.app = None
+        self.handlers = {}
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+
+    def register(self, job_type, validate=None):
+        """
+        Decorator registering ``fn(params, report_progress)`` as the handler of
+        ``job_type``. ``validate(params)`` may raise ValueError to reject a job
+        before it is stored.
+        """
+        def decorator(fn):
+            self.handlers[job_type] = (fn, validate)
+            return fn
+        return decorator
+
+    def init_app(self, app, recover=True):
+        """Bind the queue to the app and (unless ``recover`` is False) resume jobs left over from earlier runs"""
+        self.app = app
+        app.extensions['job_queue'] = self
+        if recover and JOB_WORKERS > 0:
+            with app.app_context():
+                self.recover()
+
+    def enqueue(self, job_type, params):
+        """Store a new job and hand it to a worker; raises ValueError for bad input"""
+        if job_type not in self.handlers:
+            raise ValueError(f'Unknown job type: {job_type}. Must be one of: {", ".join(sorted(self.handlers))}')
+        _, validate = self.handlers[job_type]
+        if validate:
+            validate(params)
+
+        job = Job(type=job_type, params=json.dumps(params, ensure_ascii=False))
+        db.session.add(job)
+        db.session.commit()
+        print(f"📥 Queued {job_type} job {job.id}")
+        self._dispatch(job.id)
+        return job
+
+    def recover(self):
+        """Re-queue abandoned jobs and dispatch everything that is queued"""
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        abandoned = Job.query.filter(Job.status == JOB_RUNNING, Job.started_at < stale_before).all()
+        for job in abandoned:
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                job.status = JOB_FAILED
+                job.error = f'Abandoned after {job.attempts} attempts'
+                job.finished_at = datetime.utcnow()
+            else:
+                job.status = JOB_QUEUED
+        db.session.commit()
+
+        queued = [job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == JOB_QUEUED).order_by(Job.created_at)]
+        for job_id in queued:
+            self._dispatch(job_id)
+        if abandoned or queued:
+            print(f"🔁 Resumed {len(queued)} queued job(s), {len(abandoned)} abandoned")
+
+    def run_pending(self, limit=None):
+        """Run queued jobs in the current thread until none are left; returns the number run"""
+        count = 0
+        while limit is None or count < limit:
+            job_id = db.session.query(Job.id).filter(Job.status == JOB_QUEUED).order_by(Job.created_at).limit(1).scalar()
+            if job_id is None:
+                break
+            if self.run(job_id):
+                count += 1
+        return count
+
+    def _dispatch(self, job_id):
+        if JOB_WORKERS <= 0 or self.app is None:
+            return
+        app = self.app
+
+        def work():
+            with app.app_context():
+                self.run(job_id)
+
+        get_executor('jobs', JOB_WORKERS).submit(work)
+
+    def _claim(self, job_id):
+        """Atomically move a queued job to running; False if someone else got it"""
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=datetime.utcnow(), attempts=Job.attempts + 1)
+        ).rowcount == 1
+        db.session.commit()
+        return claimed
+
+    def run(self, job_id):
+        """Claim and run one job, storing its result; returns whether it was run here"""
+        if not self._claim(job_id):
+            return False
+
+        job = db.session.get(Job, job_id)
+        handler, _ = self.handlers.get(job.type, (None, None))
+        started = time.perf_counter()
+
+        def report_progress(done, total=None):
+            job.progress = done
+            if total is not None:
+                job.total = total
+            db.session.commit()
+
+        try:
+            if handler is None:
+                raise ValueError(f'No handler for job type {job.type}')
+            result = handler(json.loads(job.params), report_progress)
+            if 'error' in result:
+                job.status = JOB_FAILED
+                job.error = result['error']
+            else:
+                job.status = JOB_SUCCEEDED
+            job.result = json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = JOB_FAILED
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        with self._lock:
+            if job.status == JOB_SUCCEEDED:
+                self._completed += 1
+            else:
+                self._failed += 1
+        icon = "✅" if job.status == JOB_SUCCEEDED else "❌"
+        print(f"{icon} {job.type} job {job.id} {job.status} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def stats(self):
+        """Jobs finished by this process"""
+        with self._lock:
+            return {
+                "workers": JOB_WORKERS,
+                "completed": self._completed,
+                "failed": self._failed
+            }
+
+
+job_queue = JobQueue()
+
+
+def _translation_service():
+    from src.services.translation import translation_service
+    if not translation_service.is_configured():
+        raise RuntimeError('Translation service is not configured')
+    return translation_service
+
+
+def _validate_translate(params):
+    if not params.get('note_id') and not params.get('text'):
+        raise ValueError('Either note_id or text is required')
+    if params.get('note_id') and not db.session.get(Note, params['note_id']):
+        raise ValueError(f"Note {params['note_id']} not found")
+
+
+@job_queue.register('translate', _validate_translate)
+def run_translate(params, report_progress):
+    """Translate one note (with its translation memory) or a piece of text"""
+    service = _translation_service()
+    if params.get('note_id'):
+        note = db.session.get(Note, params['note_id'])
+        if note is None:
+            return {"error": f"Note {params['note_id']} not found"}
+        result = service.translate_note(
+            note,
+            params.get('translate_title', True),
+            params.get('translate_content', True),
+            deadline=JOB_DEADLINE_SECONDS
+        )
+        if 'error' not in result:
+            result['note_id'] = note.id
+        return result
+    return service.translate_document(params['text'], deadline=JOB_DEADLINE_SECONDS)
+
+
+def _validate_auto_complete(params):
+    if params.get('type', 'suggestions') not in VALID_COMPLETION_TYPES:
+        raise ValueError(f'Invalid completion type. Must be one of: {", ".join(VALID_COMPLETION_TYPES)}')
+    if not params.get('note_id') and not params.get('title') and not params.get('content'):
+        raise ValueError('Please provide a note_id, or either a title or content to work with')
+
+
+@job_queue.register('auto_complete', _validate_auto_complete)
+def run_auto_complete(params, report_progress):
+    """Auto-complete a note, or the given title and content"""
+    service = _translation_service()
+    title, content = params.get('title', ''), params.get('content', '')
+    if params.get('note_id'):
+        note = db.session.get(Note, params['note_id'])
+        if note is None:
+            return {"error": f"Note {params['note_id']} not found"}
+        title, content = note.title or '', note.content or ''
+    return service.auto_complete_note(title=title, content=content, completion_type=params.get('type', 'suggestions'))
+
+
+def _validate_compact_tombstones(params):
+    days = params.get('days')
+    if days is not None and (isinstance(days, bool) or not isinstance(days, (int, float)) or days < 0):
+        raise ValueError('days must be a non-negative number')
+
+
+@job_queue.register('compact_tombstones', _validate_compact_tombstones)
+def run_compact_tombstones(params, report_progress):
+    """Delete change-feed tombstones older than ``days`` (default NOTE_TOMBSTONE_RETENTION_DAYS)"""
+    from src.services.changes import compact_tombstones, TOMBSTONE_RETENTION_DAYS
+
+    days = params.get('days')
+    removed = compact_tombstones(db.session, TOMBSTONE_RETENTION_DAYS if days is None else days)
+    return {"removed": removed}
+
+
+def _validate_bulk_translate(params):
+    note_ids = params.get('note_ids')
+    if note_ids is not None and (not isinstance(note_ids, list) or not all(isinstance(i, int) for i in note_ids)):
+        raise ValueError('note_ids must be a list of note ids')
+
+
+@job_queue.register('bulk_translate', _validate_bulk_translate)
+def run_bulk_translate(params, report_progress):
+    """Translate many notes (all of them without note_ids), one after another"""
+    service = _translation_service()
+    note_ids = params.get('note_ids')
+    if note_ids is None:
+        note_ids = [note_id for (note_id,) in db.session.query(Note.id).order_by(Note.id)]
+
+    results = {}
+    report_progress(0, len(note_ids))
+    for done, note_id in enumerate(note_ids, 1):
+        note = db.session.get(Note, note_id)
+        if note is None:
+            results[str(note_id)] = {"error": "Note not found"}
+        else:
+            result = service.translate_note(note, deadline=JOB_DEADLINE_SECONDS)
+            results[str(note_id)] = {"error": result['error']} if 'error' in result else result['translations']
+        report_progress(done)
+
+    failed = sum(1 for result in results.values() if 'error' in result)
+    return {
+        "notes": results,
+        "succeeded": len(results) - failed,
+        "failed": failed
+    }
@@ -0,0 +1,51 @@
+"""
+Stand-ins for services that are expensive to import.
+
+A LazyService imports its module and fetches the instance the first time it
+is used, so importing a blueprint does not pull in the translation service
+(and requests, and the chunking code) until a request needs it. It is falsy
+when the import fails, so views keep their ``if not translation_service``
+availability checks; the error is kept in ``error``.
+"""
+import importlib
+import threading
+
+
+class LazyService:
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+        self.error = None
+        self._service = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self):
+        """The service, imported on the first call; None if the import failed"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._service = getattr(importlib.import_module(self.module), self.name)
+                    except Exception as e:
+                        print(f"❌ {self.name} not available: {e}")
+                        self.error = str(e)
+                    self._loaded = True
+        return self._service
+
+    def __bool__(self):
+        return self.load() is not None
+
+    def __getattr__(self, attr):
+        service = self.load()
+        if service is None:
+            raise AttributeError(f"{self.name} is not available: {self.error}")
+        return getattr(service, attr)
+
+
+# Create a global instance
+translation_service = LazyService('src.services.translation', 'translation_service')
@@ -0,0 +1,186 @@
+"""
+Prometheus metrics, served at /metrics.
+
+    notetaker_http_requests_total{method, route, status}
+    notetaker_http_request_duration_seconds{method, route}    histogram
+    notetaker_http_requests_in_progress{method}               gauge
+    notetaker_llm_requests_total{operation}
+    notetaker_llm_errors_total{operation, reason}
+    notetaker_llm_request_duration_seconds{operation}          histogram
+    notetaker_cache_lookups_total{cache, result}               hit or miss
+    notetaker_db_pool_checkout_seconds{engine}                 histogram
+
+``route`` is the URL rule (``/api/notes/<int:note_id>``), so label values
+stay bounded. ``operation`` is ``translate`` or the auto-complete type; a
+streamed call is measured until its whole body has been read. The
+pool histogram measures how long a connection checkout waits: for a free
+pooled connection, or for a new connection when the engine has no pool.
+
+With several worker processes (gunicorn), set PROMETHEUS_MULTIPROC_DIR to an
+empty directory shared by the workers before they start. Every worker then
+writes its samples there and /metrics reports the sum over all of them.
+Without it, /metrics reports the current process only.
+
+prometheus_client is optional: without it nothing is recorded and /metrics
+answers 503. It is imported by the first request rather than at startup.
+"""
+import os
+import time
+import threading
+import importlib.util
+from flask import Response, jsonify, request
+from src.models.session import READ_ENGINE_EXTENSION
+
+# prometheus_client itself is imported when the first metric is recorded
+PROMETHEUS_AVAILABLE = importlib.util.find_spec('prometheus_client') is not None
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+POOL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Instruments:
+    """The metric objects; building them imports prometheus_client"""
+
+    def __init__(self):
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.requests = Counter(
+            'notetaker_http_requests_total', 'HTTP requests', ['method', 'route', 'status']
+        )
+        self.request_seconds = Histogram(
+            'notetaker_http_request_duration_seconds', 'HTTP request latency', ['method', 'route']
+        )
+        self.in_progress = Gauge(
+            'notetaker_http_requests_in_progress', 'HTTP requests being handled', ['method'],
+            multiprocess_mode='livesum'
+        )
+        self.llm_requests = Counter(
+            'notetaker_llm_requests_total', 'Model API calls', ['operation']
+        )
+        self.llm_errors = Counter(
+            'notetaker_llm_errors_total', 'Failed model API calls', ['operation', 'reason']
+        )
+        self.llm_seconds = Histogram(
+            'notetaker_llm_request_duration_seconds', 'Model API call latency', ['operation'],
+            buckets=LLM_BUCKETS
+        )
+        self.cache_lookups = Counter(
+            'notetaker_cache_lookups_total', 'Cache lookups', ['cache', 'result']
+        )
+        self.pool_checkout_seconds = Histogram(
+            'notetaker_db_pool_checkout_seconds', 'Time to check out a database connection', ['engine'],
+            buckets=POOL_BUCKETS
+        )
+
+
+_instruments = None
+_instruments_lock = threading.Lock()
+
+
+def instruments():
+    """The process's Instruments, created on first use"""
+    global _instruments
+    if _instruments is None:
+        with _instruments_lock:
+            if _instruments is None:
+                _instruments = Instruments()
+    return _instruments
+
+
+def record_llm_call(operation, seconds, error=None):
+    """Count one model API call; ``error`` is a short reason when it failed"""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    meters = instruments()
+    operation = operation or 'unknown'
+    meters.llm_requests.labels(operation).inc()
+    meters.llm_seconds.labels(operation).observe(seconds)
+    if error is not None:
+        meters.llm_errors.labels(operation, error).inc()
+
+
+def record_cache_lookup(cache, hit):
+    if PROMETHEUS_AVAILABLE:
+        instruments().cache_lookups.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+_timed_pool_classes = {}
+
+
+def _timed_pool_class(pool_class, engine_name):
+    """Subclass of ``pool_class`` that times every checkout (kept by pool.recreate())"""
+    key = (pool_class, engine_name)
+    if key not in _timed_pool_classes:
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super(timed, self)._do_get()
+            finally:
+                instruments().pool_checkout_seconds.labels(engine_name).observe(time.perf_counter() - started)
+
+        timed = type(f'Timed{pool_class.__name__}', (pool_class,), {'_do_get': _do_get})
+        _timed_pool_classes[key] = timed
+    return _timed_pool_classes[key]
+
+
+def instrument_pool(engine, engine_name):
+    """Time connection checkouts of ``engine``'s pool"""
+    if PROMETHEUS_AVAILABLE and engine is not None and type(engine.pool) not in _timed_pool_classes.values():
+        engine.pool.__class__ = _timed_pool_class(type(engine.pool), engine_name)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+class Metrics:
+    def init_app(self, app, db):
+        """Record request metrics for ``app`` and serve them at /metrics"""
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        if not PROMETHEUS_AVAILABLE:
+            print("⚠️ prometheus_client not installed, /metrics is disabled")
+            return
+
+        with app.app_context():
+            instrument_pool(db.engine, 'primary')
+        instrument_pool(app.extensions.get(READ_ENGINE_EXTENSION), 'read')
+
+        @app.before_request
+        def start_request_metrics():
+            request.environ['metrics.started'] = time.perf_counter()
+            instruments().in_progress.labels(request.method).inc()
+
+        @app.after_request
+        def record_status(response):
+            request.environ['metrics.status'] = response.status_code
+            return response
+
+        @app.teardown_request
+        def record_request_metrics(exc):
+            started = request.environ.pop('metrics.started', None)
+            if started is None:
+                return
+            meters = instruments()
+            meters.in_progress.labels(request.method).dec()
+            route = _route()
+            status = request.environ.get('metrics.status', 500)
+            meters.requests.labels(request.method, route, str(status)).inc()
+            meters.request_seconds.labels(request.method, route).observe(time.perf_counter() - started)
+
+    def metrics_view(self):
+        if not PROMETHEUS_AVAILABLE:
+            return jsonify({'error': 'Metrics are not available: prometheus_client is not installed'}), 503
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+        from prometheus_client import multiprocess
+
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+# Create a global instance
+metrics = Metrics()
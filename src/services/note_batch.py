@@ -0,0 +1,203 @@
+"""
+Batched note writes: many creates, updates and deletes in one transaction.
+
+Operations are validated and checked against the current rows (fetched in
+one SELECT) first. The survivors are then written with one executemany
+statement per kind, so a batch costs a handful of statements and a single
+commit however many operations it holds.
+
+These are Core/bulk statements, so the per-object ORM hooks do not run;
+change_seq, version, content_hash, preview, the note_content rows and
+tombstones are maintained here directly, the same way the ORM hooks and
+Note.content would (see src/services/changes.py).
+"""
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete
+from src.models.user import db
+from src.models.note import Note
+from src.models.note_content import NoteContent
+from src.models.note_translation import NoteTranslation
+from src.models.change_log import ChangeCounter, NoteTombstone
+from src.services.changes import NOTE_COUNTER
+from src.services.note_serializer import note_select, note_row_to_dict
+
+MAX_BATCH_OPERATIONS = 5000
+
+# Result status of operations skipped because another operation of an atomic batch failed
+NOT_APPLIED = 424
+
+
+def _error(index, op, status, message, note_id=None):
+    result = {'index': index, 'op': op, 'status': status, 'error': message}
+    if note_id is not None:
+        result['id'] = note_id
+    return result
+
+
+def _validate(index, operation, seen_ids):
+    """Return an error result for a malformed operation, or None"""
+    if not isinstance(operation, dict):
+        return _error(index, None, 400, 'Operation must be an object')
+    op = operation.get('op')
+    if op == 'create':
+        if 'title' not in operation or 'content' not in operation:
+            return _error(index, op, 400, 'Title and content are required')
+        return None
+    if op not in ('update', 'delete'):
+        return _error(index, op, 400, 'op must be one of: create, update, delete')
+
+    note_id = operation.get('id')
+    if not isinstance(note_id, int):
+        return _error(index, op, 400, 'id must be an integer')
+    if note_id in seen_ids:
+        return _error(index, op, 400, 'Each note may only be updated or deleted once per batch', note_id)
+    seen_ids.add(note_id)
+    if 'base_version' in operation and not isinstance(operation['base_version'], int):
+        return _error(index, op, 400, 'base_version must be an integer', note_id)
+    if op == 'update' and 'title' not in operation and 'content' not in operation:
+        return _error(index, op, 400, 'Nothing to update', note_id)
+    return None
+
+
+def run_batch(operations, get_ids=(), atomic=True):
+    """
+    Apply ``operations`` and read ``get_ids`` afterwards.
+
+    Returns (committed, results, notes): one result per operation with an
+    HTTP-style ``status``, and the notes of ``get_ids`` that exist. With
+    ``atomic`` any failed operation rolls back the whole batch and the other
+    operations are reported with status 424.
+    """
+    session = db.session
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        error = _validate(index, operation, seen_ids)
+        if error:
+            results[index] = error
+        elif operation['op'] == 'create':
+            creates.append((index, operation))
+        elif operation['op'] == 'update':
+            updates.append((index, operation))
+        else:
+            deletes.append((index, operation))
+
+    # Current state of every note the batch touches, locked until commit where supported
+    target_ids = [operation['id'] for _, operation in updates + deletes]
+    current = {}
+    if target_ids:
+        rows = session.execute(
+            select(Note.id, Note.title, Note.version, Note.content_hash,
+                   NoteContent.text, NoteContent.codec, NoteContent.data)
+            .outerjoin(NoteContent, NoteContent.note_id == Note.id)
+            .where(Note.id.in_(target_ids))
+            .with_for_update(of=Note)
+        )
+        current = {row.id: row for row in rows}
+
+    def check(index, operation):
+        row = current.get(operation['id'])
+        if row is None:
+            results[index] = _error(index, operation['op'], 404, 'Note not found', operation['id'])
+        elif 'base_version' in operation and operation['base_version'] != row.version:
+            results[index] = _error(index, operation['op'], 409, 'Note has changed since base_version', operation['id'])
+            results[index]['version'] = row.version
+        return row if results[index] is None else None
+
+    update_rows = []
+    for index, operation in updates:
+        row = check(index, operation)
+        if row is None:
+            continue
+        old_content = NoteContent.unpack(row.text, row.codec, row.data)
+        title = operation.get('title', row.title)
+        content = operation.get('content', old_content)
+        content_hash = Note.compute_hash(title, content)
+        if content_hash == row.content_hash:
+            results[index] = {'index': index, 'op': 'update', 'status': 200, 'id': row.id,
+                              'version': row.version, 'unchanged': True}
+            continue
+        # ``version`` is the expected current version: Note's version_id_col makes
+        # the bulk UPDATE match on it and store version + 1
+        update_rows.append((index, {
+            'id': row.id, 'title': title, 'preview': Note.make_preview(content),
+            'content_hash': content_hash, 'version': row.version
+        }, content if content != old_content else None))
+
+    delete_ids = []
+    for index, operation in deletes:
+        row = check(index, operation)
+        if row is not None:
+            delete_ids.append((index, row.id))
+
+    failed = any(result is not None and result['status'] >= 400 for result in results)
+    if failed and atomic:
+        session.rollback()
+        for index, operation in enumerate(operations):
+            if results[index] is None or results[index]['status'] < 400:
+                op = operation.get('op') if isinstance(operation, dict) else None
+                results[index] = _error(index, op, NOT_APPLIED, 'Not applied: another operation in the batch failed')
+        return False, results, []
+
+    changed = len(creates) + len(update_rows) + len(delete_ids)
+    if changed:
+        seq = ChangeCounter.allocate(session.connection(), NOTE_COUNTER, changed)
+        now = datetime.utcnow()
+
+        if creates:
+            rows = []
+            for _, operation in creates:
+                rows.append({
+                    'title': operation['title'], 'preview': Note.make_preview(operation['content']),
+                    'created_at': now, 'updated_at': now, 'change_seq': seq, 'version': 1,
+                    'content_hash': Note.compute_hash(operation['title'], operation['content'])
+                })
+                seq += 1
+            created = session.execute(
+                insert(Note).returning(Note.id, Note.version, sort_by_parameter_order=True), rows
+            ).all()
+            session.execute(insert(NoteContent), [
+                {'note_id': row.id, **NoteContent.pack(operation['content'])}
+                for (_, operation), row in zip(creates, created)
+            ])
+            for (index, _), row in zip(creates, created):
+                results[index] = {'index': index, 'op': 'create', 'status': 201, 'id': row.id, 'version': row.version}
+
+        if update_rows:
+            for _, values, _ in update_rows:
+                values.update(change_seq=seq, updated_at=now)
+                seq += 1
+            session.execute(update(Note), [values for _, values, _ in update_rows])
+            bodies = [
+                {'note_id': values['id'], **NoteContent.pack(content)}
+                for _, values, content in update_rows if content is not None
+            ]
+            if bodies:
+                session.execute(update(NoteContent), bodies)
+            for index, values, _ in update_rows:
+                results[index] = {'index': index, 'op': 'update', 'status': 200, 'id': values['id'],
+                                  'version': values['version'] + 1, 'unchanged': False}
+
+        if delete_ids:
+            ids = [note_id for _, note_id in delete_ids]
+            session.execute(delete(NoteTranslation).where(NoteTranslation.note_id.in_(ids)))
+            session.execute(delete(NoteTombstone).where(NoteTombstone.note_id.in_(ids)))
+            session.execute(delete(NoteContent).where(NoteContent.note_id.in_(ids)))
+            session.execute(delete(Note).where(Note.id.in_(ids)))
+            tombstones = []
+            for index, note_id in delete_ids:
+                tombstones.append({'note_id': note_id, 'change_seq': seq, 'deleted_at': now})
+                seq += 1
+                results[index] = {'index': index, 'op': 'delete', 'status': 204, 'id': note_id}
+            session.execute(insert(NoteTombstone), tombstones)
+
+    session.commit()
+
+    notes = []
+    if get_ids:
+        rows = session.execute(note_select().where(Note.id.in_(list(get_ids))))
+        found = {row.id: row for row in rows}
+        notes = [note_row_to_dict(found[note_id]) for note_id in get_ids if note_id in found]
+    return True, results, notes
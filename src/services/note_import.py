@@ -0,0 +1,331 @@
+"""
+Bulk import of notes from Markdown, ZIP archives of Markdown files, or NDJSON.
+
+Accepted inputs mirror what the export endpoints produce:
+
+- ``markdown``: a single exported note (YAML frontmatter, ``# Title`` heading
+  and export footer), the combined "All Notes Export" file, or any plain
+  Markdown file (titled by its first heading or file name)
+- ``zip``: an archive of such Markdown files, one note per ``.md`` entry
+- ``ndjson``: one JSON object per line with ``title``, ``content`` and
+  optional ``created_at`` / ``updated_at``
+
+Input is parsed as a stream and notes are inserted with executemany in
+batches of IMPORT_BATCH_SIZE, one transaction per batch. Each batch also
+advances a NoteImport row in the same transaction, so a failed import is
+resumed by passing its id: records already committed are skipped.
+"""
+import io
+import os
+import re
+import json
+import time
+import shutil
+import zipfile
+import tempfile
+from datetime import datetime
+from sqlalchemy import insert
+from src.models.user import db
+from src.models.note import Note
+from src.models.note_content import NoteContent
+from src.models.note_import import NoteImport
+from src.models.change_log import ChangeCounter
+from src.services.changes import NOTE_COUNTER
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+ZIP_SPOOL_MEMORY_BYTES = 16 * 1024 * 1024
+
+FORMATS = ('markdown', 'zip', 'ndjson')
+EXTENSIONS = {
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+    '.zip': 'zip',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+TITLE_MAX_LENGTH = Note.__table__.c.title.type.length
+
+EXPORT_FOOTER_RE = re.compile(r'\n---\n\*Exported from NoteTaker on [^\n]*\*\s*$')
+SECTION_RE = re.compile(r'^## \d+\. (.*)$')
+META_RE = re.compile(r'^\*\*(ID|Created|Updated):\*\* (.*?)\s*$')
+
+
+class NoteImportError(Exception):
+    """An import stopped part-way; ``note_import`` tells where to resume"""
+
+    def __init__(self, message, note_import):
+        super().__init__(message)
+        self.note_import = note_import
+
+
+def detect_format(filename):
+    """Guess the import format from a file name, or None"""
+    return EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip().strip('"'))
+    except ValueError:
+        return None
+
+
+def make_record(title, content, created_at=None, updated_at=None):
+    """Row for the note table plus its ``content``, with defaults filled in so every row has the same keys"""
+    now = datetime.utcnow()
+    created_at = created_at or now
+    title = (title or 'Untitled').strip()[:TITLE_MAX_LENGTH] or 'Untitled'
+    content = content or ''
+    return {
+        'title': title,
+        'content': content,
+        'created_at': created_at,
+        'updated_at': updated_at or created_at,
+        'preview': Note.make_preview(content),
+        'version': 1,
+        'content_hash': Note.compute_hash(title, content),
+    }
+
+
+def parse_markdown_note(text, fallback_title='Untitled'):
+    """Parse one note exported by generate_note_markdown (or plain Markdown)"""
+    text = text.replace('\r\n', '\n').lstrip('\ufeff')
+    meta = {}
+    body = text
+    if text.startswith('---\n'):
+        end = text.find('\n---\n', 4)
+        if end != -1:
+            for line in text[4:end].splitlines():
+                key, sep, value = line.partition(':')
+                if sep:
+                    meta[key.strip()] = value.strip()
+            body = text[end + 5:]
+
+    body = EXPORT_FOOTER_RE.sub('', body).strip('\n')
+    title = meta.get('title', '').strip('"') or None
+    first_line, _, rest = body.partition('\n')
+    if first_line.startswith('# '):
+        # The exporter repeats the title as the main heading
+        title = title or first_line[2:].strip()
+        if first_line[2:].strip() == title:
+            body = rest
+    content = body.strip()
+    if content == '*No content*':
+        content = ''
+
+    return make_record(
+        title or fallback_title,
+        content,
+        _parse_datetime(meta.get('created')),
+        _parse_datetime(meta.get('updated')),
+    )
+
+
+def iter_combined_markdown(lines):
+    """Parse the export-all file ("# All Notes Export") section by section"""
+    record = None
+    content = []
+    lines = iter(lines)
+    lookahead = []
+
+    def next_line():
+        if lookahead:
+            return lookahead.pop(0)
+        return next(lines, None)
+
+    def peek(count):
+        while len(lookahead) < count:
+            line = next(lines, None)
+            if line is None:
+                break
+            lookahead.append(line)
+        return lookahead[:count]
+
+    def finish():
+        text = '\n'.join(content).strip('\n')
+        if text.endswith('\n---') or text == '---':
+            text = text[:-3]
+        text = text.strip()
+        return make_record(record['title'], '' if text == '*No content*' else text,
+                           record.get('created'), record.get('updated'))
+
+    while True:
+        line = next_line()
+        if line is None:
+            break
+        line = line.rstrip('\r\n')
+        section = SECTION_RE.match(line)
+        # A section header is followed by a blank line and the **ID:** line
+        following = [l.rstrip('\r\n') for l in peek(2)] if section else []
+        if len(following) == 2 and not following[0] and META_RE.match(following[1]):
+            if record is not None:
+                yield finish()
+            record = {'title': section.group(1)}
+            content = []
+            next_line()  # blank line
+            while peek(1) and META_RE.match(peek(1)[0].rstrip('\r\n')):
+                key, value = META_RE.match(next_line().rstrip('\r\n')).groups()
+                if key in ('Created', 'Updated'):
+                    record[key.lower()] = _parse_datetime(value)
+            continue
+        if record is not None:
+            content.append(line)
+
+    if record is not None:
+        yield finish()
+
+
+def iter_markdown(fileobj, filename):
+    """Records from a Markdown file: one note, or the combined export"""
+    text_stream = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    first = text_stream.readline()
+    if first.rstrip('\r\n') == '# All Notes Export':
+        yield from iter_combined_markdown(text_stream)
+    else:
+        fallback_title = os.path.splitext(os.path.basename(filename or ''))[0] or 'Untitled'
+        yield parse_markdown_note(first + text_stream.read(), fallback_title)
+
+
+def seekable(fileobj):
+    """
+    ``fileobj`` itself if it can seek, otherwise a copy in a temporary file
+    (in memory up to ZIP_SPOOL_MEMORY_BYTES). ZipFile reads the archive's
+    directory from its end, so a raw request body has to be copied first.
+    """
+    if getattr(fileobj, 'seekable', lambda: False)():
+        return fileobj
+    spooled = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MEMORY_BYTES)
+    shutil.copyfileobj(fileobj, spooled)
+    spooled.seek(0)
+    return spooled
+
+
+def iter_zip(fileobj):
+    """Records from every Markdown entry of a ZIP archive, in archive order"""
+    source = seekable(fileobj)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or detect_format(info.filename) != 'markdown':
+                    continue
+                with archive.open(info) as entry:
+                    fallback_title = os.path.splitext(os.path.basename(info.filename))[0]
+                    yield parse_markdown_note(entry.read().decode('utf-8'), fallback_title)
+    finally:
+        if source is not fileobj:
+            source.close()
+
+
+def iter_ndjson(fileobj):
+    """Records from newline-delimited JSON objects"""
+    for line_number, line in enumerate(io.TextIOWrapper(fileobj, encoding='utf-8-sig'), 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f'Invalid JSON on line {line_number}: {e}')
+        if not isinstance(item, dict):
+            raise ValueError(f'Line {line_number} is not a JSON object')
+        yield make_record(
+            item.get('title'),
+            item.get('content'),
+            _parse_datetime(item.get('created_at')),
+            _parse_datetime(item.get('updated_at')),
+        )
+
+
+def iter_records(fileobj, import_format, filename=None):
+    """Parse a binary file object into note rows, lazily"""
+    if import_format == 'markdown':
+        return iter_markdown(fileobj, filename)
+    if import_format == 'zip':
+        return iter_zip(fileobj)
+    if import_format == 'ndjson':
+        return iter_ndjson(fileobj)
+    raise ValueError(f'Invalid format. Must be one of: {", ".join(FORMATS)}')
+
+
+def import_notes(fileobj, import_format, source, resume=None, batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    """
+    Import notes from ``fileobj`` in batched transactions.
+
+    Args:
+        resume: id of an earlier NoteImport of the same input; its committed
+            records are skipped
+        on_batch: optional callable(stats) called after each committed batch
+
+    Returns a stats dict. Raises ValueError for a bad resume id and
+    NoteImportError (carrying the NoteImport) if the import fails part-way.
+    """
+    if resume:
+        note_import = db.session.get(NoteImport, resume)
+        if note_import is None:
+            raise ValueError(f'Import {resume} not found')
+        if note_import.format != import_format:
+            raise ValueError(f'Import {resume} was a {note_import.format} import')
+        if note_import.status == 'completed':
+            raise ValueError(f'Import {resume} has already completed')
+        note_import.status = 'running'
+        note_import.error = None
+    else:
+        note_import = NoteImport(source=source[:255], format=import_format)
+        db.session.add(note_import)
+    db.session.commit()
+
+    skip = note_import.records_committed
+    started = time.perf_counter()
+    stats = {'import_id': note_import.id, 'imported': 0, 'skipped': skip, 'batches': 0}
+
+    def report():
+        seconds = time.perf_counter() - started
+        stats['seconds'] = round(seconds, 3)
+        stats['notes_per_second'] = round(stats['imported'] / seconds, 1) if seconds else None
+        return stats
+
+    def flush(batch):
+        # Core inserts bypass the ORM hook that stamps change_seq
+        first_seq = ChangeCounter.allocate(db.session.connection(), NOTE_COUNTER, len(batch))
+        contents = []
+        for offset, record in enumerate(batch):
+            record['change_seq'] = first_seq + offset
+            contents.append(record.pop('content'))
+        ids = db.session.execute(
+            insert(Note).returning(Note.id, sort_by_parameter_order=True), batch
+        ).scalars().all()
+        db.session.execute(insert(NoteContent), [
+            {'note_id': note_id, **NoteContent.pack(content)} for note_id, content in zip(ids, contents)
+        ])
+        note_import.records_committed += len(batch)
+        db.session.commit()
+        stats['imported'] += len(batch)
+        stats['batches'] += 1
+        if on_batch:
+            on_batch(report())
+
+    try:
+        batch = []
+        for index, record in enumerate(iter_records(fileobj, import_format, source)):
+            if index < skip:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except Exception as e:
+        db.session.rollback()
+        note_import.status = 'failed'
+        note_import.error = str(e)
+        db.session.commit()
+        raise NoteImportError(str(e), note_import) from e
+
+    note_import.status = 'completed'
+    db.session.commit()
+    report()
+    print(f"📥 Imported {stats['imported']} notes in {stats['seconds']}s ({stats['notes_per_second']} notes/s)")
+    return stats
@@ -0,0 +1,205 @@
+"""
+In-process cache of note read responses.
+
+GET /api/notes, /api/notes/<id> and /api/notes/search responses are kept
+as encoded bytes (with their ETag) in a bounded LRU, keyed by path and
+query string. Every entry is tagged with the write generation it was built
+at: the value of the ``note`` change counter, which every create, update
+and delete advances in the same transaction (see src/services/changes.py).
+A lookup at a newer generation drops the whole cache, so a hit is never
+older than the latest committed write.
+
+The counter lives in the database, so writes made by other workers
+invalidate this process's cache too. Reading it is a primary-key lookup;
+READ_CACHE_GENERATION_TTL lets a process reuse the value it read for a
+short while (trading that much staleness across workers for fewer
+queries). Commits in this process always force a fresh read. Behind a
+read replica the generation is read where the request reads; a lagging
+replica's older generation simply misses and is not stored.
+
+Configuration: READ_CACHE_ENABLED, READ_CACHE_SIZE (entries),
+READ_CACHE_MAX_BYTES, READ_CACHE_TTL and READ_CACHE_GENERATION_TTL (seconds).
+"""
+import os
+import time
+import threading
+from functools import wraps
+from collections import OrderedDict, namedtuple
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.change_log import ChangeCounter
+from src.services.metrics import record_cache_lookup
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60.0
+
+# Per-entry bookkeeping on top of the body, for the memory estimate
+ENTRY_OVERHEAD_BYTES = 200
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'status', 'mimetype', 'etag', 'cache_control'])
+
+
+class ReadCache:
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, generation_ttl=None, enabled=None):
+        if max_entries is None:
+            max_entries = int(os.getenv('READ_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+        if max_bytes is None:
+            max_bytes = int(os.getenv('READ_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        if ttl is None:
+            ttl = float(os.getenv('READ_CACHE_TTL', DEFAULT_TTL_SECONDS))
+        if generation_ttl is None:
+            generation_ttl = float(os.getenv('READ_CACHE_GENERATION_TTL', 0))
+        if enabled is None:
+            enabled = os.getenv('READ_CACHE_ENABLED', '1') != '0'
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self.enabled = enabled
+
+        # key -> (generation, expires_at, size, CachedResponse)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generation = None
+        self._generation_checked = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, session):
+        """Current write generation, re-read from the database when due"""
+        now = time.monotonic()
+        with self._lock:
+            if self._generation is not None and now - self._generation_checked < self.generation_ttl:
+                return self._generation
+        generation = ChangeCounter.current(session, 'note')
+        with self._lock:
+            if self._generation is None or generation > self._generation:
+                if self._entries:
+                    self.invalidations += 1
+                self._clear()
+                self._generation = generation
+                self._generation_checked = now
+            elif generation == self._generation:
+                self._generation_checked = now
+            # An older generation (read from a lagging replica) only misses
+        return generation
+
+    def mark_stale(self):
+        """Re-read the generation on the next lookup (called after local commits)"""
+        with self._lock:
+            self._generation_checked = float('-inf')
+
+    def get(self, key, generation):
+        """Return the CachedResponse for ``key`` built at ``generation``, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation or entry[1] < time.monotonic():
+                if entry is not None and (entry[0] < generation or entry[1] < time.monotonic()):
+                    self._remove(key)
+                self.misses += 1
+                record_cache_lookup('read', False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache_lookup('read', True)
+            return entry[3]
+
+    def put(self, key, generation, response):
+        """Store a CachedResponse built at ``generation``"""
+        size = len(response.body) + len(key) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                # Built from data a newer write has already replaced
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (generation, time.monotonic() + self.ttl, size, response)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'generation': self._generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def cached_read(view):
+    """
+    Serve a GET view from read_cache. Only 200 responses are stored;
+    If-None-Match is answered from the cached ETag.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not read_cache.enabled or request.method != 'GET':
+            return view(*args, **kwargs)
+
+        key = request.full_path
+        generation = read_cache.generation(db.session)
+        cached = read_cache.get(key, generation)
+        if cached is not None:
+            if cached.etag and request.if_none_match.contains_weak(cached.etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(cached.body, cached.status)
+                response.mimetype = cached.mimetype
+            if cached.etag:
+                response.set_etag(cached.etag)
+            if cached.cache_control:
+                response.headers['Cache-Control'] = cached.cache_control
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            etag, _ = response.get_etag()
+            read_cache.put(key, generation, CachedResponse(
+                response.get_data(), response.status_code, response.mimetype,
+                etag, response.headers.get('Cache-Control')
+            ))
+        return response
+    return wrapper
+
+
+# Create a global instance
+read_cache = ReadCache()
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    read_cache.mark_stale()
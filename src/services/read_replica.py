@@ -0,0 +1,56 @@
+"""
+Optional read replica.
+
+With DATABASE_REPLICA_URL set, the SELECTs of GET and HEAD requests (note
+list, get, search, export, change feed) run on a separate engine pointed at
+the replica, while writes and everything else stay on DATABASE_URL. See
+src/models/session.py for the routing rules.
+
+A client that has just written is kept on the primary for
+REPLICA_READ_YOUR_WRITES_SECONDS (default 5), which should exceed the
+usual replication lag, so it always sees its own changes.
+
+For a local test, point the two URLs at two SQLite files (copy the primary
+to the replica to "replicate") or at two local Postgres instances.
+"""
+import os
+from sqlalchemy import create_engine
+from src.models.user import db
+from src.models.session import init_read_routing
+
+REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+READ_YOUR_WRITES_SECONDS = float(os.getenv('REPLICA_READ_YOUR_WRITES_SECONDS', 5))
+
+
+class ReadReplica:
+    def __init__(self):
+        self.engine = None
+        self.read_your_writes_seconds = READ_YOUR_WRITES_SECONDS
+
+    def init_app(self, app, url=REPLICA_URL):
+        """Route the app's read-only requests to the replica at ``url``, if given"""
+        if not url:
+            return False
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        options.setdefault('pool_pre_ping', True)
+        self.engine = create_engine(url, **options)
+        app.extensions['read_replica'] = self
+        init_read_routing(app, db, self.engine, self.read_your_writes_seconds)
+        print(f"✅ Read replica enabled ({self.engine.url.render_as_string(hide_password=True)}), "
+              f"read-your-writes window {self.read_your_writes_seconds:g}s")
+        return True
+
+    def stats(self):
+        if self.engine is None:
+            return {'enabled': False}
+        pool = self.engine.pool
+        return {
+            'enabled': True,
+            'url': self.engine.url.render_as_string(hide_password=True),
+            'read_your_writes_seconds': self.read_your_writes_seconds,
+            'pool': pool.status(),
+        }
+
+
+# Create a global instance
+read_replica = ReadReplica()
@@ -0,0 +1,173 @@
+"""
+Per-request timing broken down by phase.
+
+Each request gets a RequestTimings in a context variable, which tasks on the
+LLM thread pools inherit (see src/services/concurrency.py). Hooks add to it:
+
+    db         SQL statements, timed around cursor execution on every engine
+    llm        outbound model calls through src/services/http_client.py (for
+               streamed calls, until the body is read and closed; that is
+               after the Server-Timing header went out, so only the log
+               line includes them)
+    serialize  JSON encoding: jsonify and src/services/note_serializer.py
+
+The breakdown goes out in a Server-Timing header (shown by browser devtools
+under Network > Timing), with ``total`` for the whole request, and one JSON
+log line per request:
+
+    {"event": "request", "method": "POST", "path": "/api/notes/1/translate",
+     "status": 200, "duration_ms": 1840.2, "db_ms": 3.1, "db_count": 4,
+     "llm_ms": 1822.5, "llm_count": 2, "serialize_ms": 0.2, "serialize_count": 1}
+
+Concurrent calls are summed, so a phase can exceed the request's duration.
+The log line is written when the request is torn down, so streamed
+responses include the time spent streaming. SERVER_TIMING=0 drops the
+header; REQUEST_LOG=0 drops the log line.
+"""
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING', '1') != '0'
+REQUEST_LOG_ENABLED = os.getenv('REQUEST_LOG', '1') != '0'
+
+PHASES = ('db', 'llm', 'serialize')
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.status = None
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            total, count = self.phases.get(phase, (0.0, 0))
+            self.phases[phase] = (total + seconds, count + 1)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        with self._lock:
+            phases = dict(self.phases)
+        metrics = [
+            f'{phase};dur={total * 1000:.2f};desc="{count} call{"s" if count != 1 else ""}"'
+            for phase, (total, count) in phases.items()
+        ]
+        metrics.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def log_record(self):
+        record = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': self.status,
+            'duration_ms': round(self.elapsed() * 1000, 2),
+        }
+        with self._lock:
+            for phase in PHASES + tuple(p for p in self.phases if p not in PHASES):
+                total, count = self.phases.get(phase, (0.0, 0))
+                record[f'{phase}_ms'] = round(total * 1000, 2)
+                record[f'{phase}_count'] = count
+        return record
+
+
+def current_timings():
+    """The current request's RequestTimings, or None outside a request"""
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing every encode as ``serialize``"""
+
+    def dumps(self, obj, **kwargs):
+        with timed('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    started = conn.info.get('query_started')
+    if timings is not None and started:
+        timings.add('db', time.perf_counter() - started.pop())
+
+
+class RequestTiming:
+    def __init__(self):
+        self._listening = False
+
+    def init_app(self, app):
+        """Time the app's requests; installs the SQLAlchemy hooks once per process"""
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._listening = True
+
+        app.json = TimedJSONProvider(app)
+
+        @app.before_request
+        def start_timing():
+            request.environ['request_timing.token'] = _current.set(RequestTimings())
+
+        @app.after_request
+        def add_server_timing(response):
+            timings = _current.get()
+            if timings is not None:
+                timings.status = response.status_code
+                if SERVER_TIMING_ENABLED:
+                    response.headers['Server-Timing'] = timings.server_timing()
+            return response
+
+        @app.teardown_request
+        def log_timing(exc):
+            timings = _current.get()
+            if timings is None:
+                return
+            if REQUEST_LOG_ENABLED:
+                if timings.status is None:
+                    timings.status = 500
+                print(json.dumps(timings.log_record()), flush=True)
+            token = request.environ.pop('request_timing.token', None)
+            if token is not None:
+                try:
+                    _current.reset(token)
+                except ValueError:
+                    # Torn down in another context (end of a streamed response)
+                    _current.set(None)
+
+
+# Create a global instance
+request_timing = RequestTiming()
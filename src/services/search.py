@@ -0,0 +1,257 @@
+"""
+Full-text search over notes.
+
+SQLite uses an FTS5 external-content table (``note_fts``) that reads titles
+and decoded bodies through the ``note_search_source`` view and is kept in
+sync by triggers on ``note`` and ``note_content``. PostgreSQL uses a
+``tsvector`` column on ``note`` with a GIN index, refreshed by triggers on
+the same two tables. Both are maintained by the database itself, so every
+write path (ORM or bulk SQL) updates the index incrementally.
+
+Any other backend, or a database where the index could not be created, falls
+back to an unranked LIKE scan.
+"""
+import re
+from sqlalchemy import text, func
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Relative weight of title matches compared with content matches
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+# FTS5 'delete' must be given exactly the values that were indexed, so every
+# trigger reads the other table's current state. A note's body row is
+# always deleted before the note row (note_fts_bd makes sure of it).
+SQLITE_SETUP = [
+    """
+    CREATE VIEW IF NOT EXISTS note_search_source AS
+    SELECT note.id AS id, note.title AS title,
+           note_body(note_content.text, note_content.codec, note_content.data) AS content
+    FROM note JOIN note_content ON note_content.note_id = note.id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS note_fts USING fts5(
+        title, content,
+        content='note_search_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_fts_content_ai AFTER INSERT ON note_content BEGIN
+        INSERT INTO note_fts(rowid, title, content) VALUES (
+            new.note_id,
+            (SELECT title FROM note WHERE id = new.note_id),
+            note_body(new.text, new.codec, new.data)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_fts_content_ad AFTER DELETE ON note_content BEGIN
+        INSERT INTO note_fts(note_fts, rowid, title, content) VALUES (
+            'delete', old.note_id,
+            (SELECT title FROM note WHERE id = old.note_id),
+            note_body(old.text, old.codec, old.data)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_fts_content_au AFTER UPDATE ON note_content BEGIN
+        INSERT INTO note_fts(note_fts, rowid, title, content) VALUES (
+            'delete', old.note_id,
+            (SELECT title FROM note WHERE id = old.note_id),
+            note_body(old.text, old.codec, old.data)
+        );
+        INSERT INTO note_fts(rowid, title, content) VALUES (
+            new.note_id,
+            (SELECT title FROM note WHERE id = new.note_id),
+            note_body(new.text, new.codec, new.data)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_fts_bd BEFORE DELETE ON note BEGIN
+        DELETE FROM note_content WHERE note_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_fts_au AFTER UPDATE OF title ON note
+    WHEN EXISTS (SELECT 1 FROM note_content WHERE note_id = new.id) BEGIN
+        INSERT INTO note_fts(note_fts, rowid, title, content)
+            SELECT 'delete', old.id, old.title, note_body(text, codec, data)
+            FROM note_content WHERE note_id = old.id;
+        INSERT INTO note_fts(rowid, title, content)
+            SELECT new.id, new.title, note_body(text, codec, data)
+            FROM note_content WHERE note_id = new.id;
+    END
+    """,
+]
+
+POSTGRES_SETUP = [
+    "ALTER TABLE note ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION note_search_vector(title text, content text) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION note_content_search_refresh() RETURNS trigger AS $$
+    BEGIN
+        UPDATE note SET search_vector = note_search_vector(note.title, NEW.text) WHERE note.id = NEW.note_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION note_title_search_refresh() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := note_search_vector(
+            NEW.title, (SELECT text FROM note_content WHERE note_id = NEW.id)
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS note_content_search ON note_content",
+    """
+    CREATE TRIGGER note_content_search AFTER INSERT OR UPDATE ON note_content
+    FOR EACH ROW EXECUTE FUNCTION note_content_search_refresh()
+    """,
+    "DROP TRIGGER IF EXISTS note_title_search ON note",
+    """
+    CREATE TRIGGER note_title_search BEFORE UPDATE OF title ON note
+    FOR EACH ROW EXECUTE FUNCTION note_title_search_refresh()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_note_search_vector ON note USING GIN (search_vector)",
+]
+
+# Fills search_vector for notes written before the triggers existed
+POSTGRES_BACKFILL = """
+    UPDATE note SET search_vector = note_search_vector(note.title, note_content.text)
+    FROM note_content WHERE note_content.note_id = note.id AND note.search_vector IS NULL
+"""
+
+
+def query_terms(query):
+    """Split a user query into plain word tokens (drops FTS operators and punctuation)"""
+    return re.findall(r'\w+', query, re.UNICODE)
+
+
+class SearchIndex:
+    def __init__(self):
+        self.backend = None
+
+    def setup(self, engine):
+        """Create the index structures for the engine's dialect (idempotent)"""
+        dialect = engine.dialect.name
+        try:
+            if dialect == 'sqlite':
+                self._setup_sqlite(engine)
+            elif dialect == 'postgresql':
+                with engine.begin() as conn:
+                    for statement in POSTGRES_SETUP:
+                        conn.execute(text(statement))
+                    conn.execute(text(POSTGRES_BACKFILL))
+            else:
+                self.backend = 'like'
+                return self.backend
+            self.backend = dialect
+        except Exception as e:
+            print(f"❌ Full-text index unavailable, falling back to LIKE search: {e}")
+            self.backend = 'like'
+        return self.backend
+
+    def _setup_sqlite(self, engine):
+        with engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'note_fts'"
+            )).first()
+            for statement in SQLITE_SETUP:
+                conn.execute(text(statement))
+            if not exists:
+                # Index notes that were written before the index existed
+                conn.execute(text("INSERT INTO note_fts(note_fts) VALUES ('rebuild')"))
+
+    def drop_legacy_index(self, engine):
+        """Drop index structures that read the legacy note.content column, if there are any"""
+        dialect = engine.dialect.name
+        with engine.begin() as conn:
+            if dialect == 'sqlite':
+                # Only the old index had an insert trigger on note
+                legacy = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'note_fts_ai'"
+                )).first()
+                if legacy:
+                    for trigger in ('note_fts_ai', 'note_fts_ad', 'note_fts_au'):
+                        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+                    conn.execute(text("DROP TABLE IF EXISTS note_fts"))
+            elif dialect == 'postgresql':
+                # The old search_vector was generated from note.content
+                legacy = conn.execute(text(
+                    "SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema() "
+                    "AND table_name = 'note' AND column_name = 'search_vector' AND is_generated = 'ALWAYS'"
+                )).first()
+                if legacy:
+                    conn.execute(text("ALTER TABLE note DROP COLUMN search_vector"))
+
+    def rebuild(self, engine):
+        """Rebuild the index from the note table"""
+        backend = self.backend or self.setup(engine)
+        with engine.begin() as conn:
+            if backend == 'sqlite':
+                conn.execute(text("INSERT INTO note_fts(note_fts) VALUES ('rebuild')"))
+                conn.execute(text("INSERT INTO note_fts(note_fts) VALUES ('optimize')"))
+            elif backend == 'postgresql':
+                conn.execute(text("UPDATE note SET search_vector = NULL"))
+                conn.execute(text(POSTGRES_BACKFILL))
+                conn.execute(text("REINDEX INDEX ix_note_search_vector"))
+        return backend
+
+    def search_ids(self, session, query, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+        """Return ids of notes matching ``query``, best match first"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        if self.backend == 'sqlite':
+            # Every term must match; the last one is a prefix so results
+            # appear while the user is still typing
+            match = ' '.join(f'"{term}"' for term in terms) + '*'
+            rows = session.execute(text(
+                "SELECT rowid FROM note_fts WHERE note_fts MATCH :match "
+                "ORDER BY bm25(note_fts, :title_weight, :content_weight) "
+                "LIMIT :limit OFFSET :offset"
+            ), {
+                'match': match, 'title_weight': TITLE_WEIGHT, 'content_weight': CONTENT_WEIGHT,
+                'limit': limit, 'offset': offset
+            })
+        elif self.backend == 'postgresql':
+            tsquery = ' & '.join(terms) + ':*'
+            rows = session.execute(text(
+                "SELECT id FROM note, to_tsquery('english', :tsquery) AS query "
+                "WHERE search_vector @@ query "
+                "ORDER BY ts_rank(search_vector, query) DESC, updated_at DESC "
+                "LIMIT :limit OFFSET :offset"
+            ), {'tsquery': tsquery, 'limit': limit, 'offset': offset})
+        else:
+            return self._like_search_ids(session, query, limit, offset)
+
+        return [row[0] for row in rows]
+
+    def _like_search_ids(self, session, query, limit, offset):
+        from src.models.note import Note
+        from src.models.note_content import NoteContent
+        content = NoteContent.text
+        if session.get_bind().dialect.name == 'sqlite':
+            # Also matches compressed bodies
+            content = func.note_body(NoteContent.text, NoteContent.codec, NoteContent.data)
+        rows = session.query(Note.id).outerjoin(NoteContent, NoteContent.note_id == Note.id).filter(
+            (Note.title.contains(query)) | (content.contains(query))
+        ).order_by(Note.updated_at.desc()).limit(limit).offset(offset)
+        return [row.id for row in rows]
+
+
+# Create a global instance
+search_index = SearchIndex()
@@ -0,0 +1,137 @@
+"""
+Production profile for SQLite databases.
+
+Used when DATABASE_URL is unset (or points at an SQLite file) and
+SQLITE_TUNING is not ``0``:
+
+- every connection runs in WAL mode with ``synchronous=NORMAL``, a memory
+  map, a larger page cache and a busy timeout, so readers never block the
+  writer and concurrent autosaves wait for each other instead of failing
+- GET and HEAD requests read through a separate pool of read-only
+  connections (see src/models/session.py), leaving the writer pool to writes
+- a background thread checkpoints the WAL every SQLITE_CHECKPOINT_SECONDS
+  and ``journal_size_limit`` truncates it afterwards, so it cannot grow
+  without bound behind long-running readers
+
+Settings: SQLITE_MMAP_SIZE (bytes), SQLITE_CACHE_SIZE_KB,
+SQLITE_BUSY_TIMEOUT_MS, SQLITE_READ_POOL_SIZE, SQLITE_CHECKPOINT_SECONDS.
+"""
+import os
+import time
+import threading
+from urllib.parse import quote
+from sqlalchemy import create_engine, event
+from src.models.user import db
+from src.models.session import init_read_routing
+
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', '1') != '0'
+MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+READ_POOL_SIZE = int(os.getenv('SQLITE_READ_POOL_SIZE', 8))
+CHECKPOINT_SECONDS = float(os.getenv('SQLITE_CHECKPOINT_SECONDS', 60))
+JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+
+def connection_pragmas(read_only=False):
+    """PRAGMA statements run on every new connection"""
+    pragmas = [
+        f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}',
+        f'PRAGMA mmap_size = {MMAP_SIZE}',
+        f'PRAGMA cache_size = -{CACHE_SIZE_KB}',
+        'PRAGMA temp_store = MEMORY',
+    ]
+    if read_only:
+        pragmas.append('PRAGMA query_only = ON')
+    else:
+        pragmas += [
+            'PRAGMA journal_mode = WAL',
+            'PRAGMA synchronous = NORMAL',
+            f'PRAGMA journal_size_limit = {JOURNAL_SIZE_LIMIT}',
+        ]
+    return pragmas
+
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    return on_connect
+
+
+class SQLiteStorage:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.read_engine = None
+        self.checkpoints = 0
+        self.last_checkpoint = None
+        self._thread = None
+
+    def init_app(self, app):
+        """Tune the app's engine if it is a file-backed SQLite database"""
+        with app.app_context():
+            engine = db.engine
+        path = engine.url.database
+        if engine.dialect.name != 'sqlite' or not SQLITE_TUNING or not path or path == ':memory:':
+            return False
+
+        self.enabled = True
+        self.path = path
+        event.listen(engine, 'connect', _apply_pragmas(connection_pragmas()))
+        # Connections opened before the listener existed
+        engine.dispose()
+
+        # WAL must be on before read-only connections can open the database
+        with engine.connect() as conn:
+            conn.exec_driver_sql('SELECT 1')
+
+        self.read_engine = create_engine(
+            f'sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&uri=true',
+            pool_size=READ_POOL_SIZE,
+            max_overflow=READ_POOL_SIZE,
+        )
+        event.listen(self.read_engine, 'connect', _apply_pragmas(connection_pragmas(read_only=True)))
+        app.extensions['sqlite_storage'] = self
+        # Same file, so reads see every committed write immediately
+        init_read_routing(app, db, self.read_engine)
+
+        if CHECKPOINT_SECONDS > 0:
+            self._thread = threading.Thread(
+                target=self._checkpoint_loop, args=(engine,), name='sqlite-checkpoint', daemon=True
+            )
+            self._thread.start()
+        print(f"✅ SQLite tuned: WAL, {READ_POOL_SIZE} read-only connections, checkpoint every {CHECKPOINT_SECONDS:g}s")
+        return True
+
+    def checkpoint(self, engine, mode='PASSIVE'):
+        """Copy the WAL back into the database file; returns (busy, wal pages, pages copied)"""
+        with engine.connect() as conn:
+            result = tuple(conn.exec_driver_sql(f'PRAGMA wal_checkpoint({mode})').one())
+        self.checkpoints += 1
+        self.last_checkpoint = result
+        return result
+
+    def _checkpoint_loop(self, engine):
+        while True:
+            time.sleep(CHECKPOINT_SECONDS)
+            try:
+                self.checkpoint(engine)
+            except Exception as e:
+                print(f"❌ WAL checkpoint failed: {e}")
+
+    def stats(self):
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'read_pool_size': READ_POOL_SIZE,
+            'checkpoints': self.checkpoints,
+            'last_checkpoint': list(self.last_checkpoint) if self.last_checkpoint else None,
+        }
+
+
+# Create a global instance
+sqlite_storage = SQLiteStorage()
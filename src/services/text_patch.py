@@ -0,0 +1,40 @@
+"""
+Apply text edits sent by the editor.
+
+An edit is a list of splices ``{"start", "delete", "insert"}`` against the
+base text: remove ``delete`` characters at ``start`` and put ``insert`` there.
+Splices must be in ascending, non-overlapping order and their offsets refer
+to the base text. Offsets count UTF-16 code units, i.e. JavaScript string
+indices, so the browser can compute them directly.
+"""
+
+
+def apply_splices(text, splices):
+    """Return ``text`` with ``splices`` applied; raises ValueError if they do not fit"""
+    if not isinstance(splices, list):
+        raise ValueError('content_patch must be a list of splices')
+
+    base = text.encode('utf-16-le')
+    units = len(base) // 2
+    pieces = []
+    position = 0
+    for splice in splices:
+        try:
+            start = int(splice['start'])
+            length = int(splice.get('delete', 0))
+            insert = splice.get('insert', '')
+        except (TypeError, KeyError, ValueError):
+            raise ValueError('Each splice needs an integer "start", "delete" and a string "insert"')
+        if not isinstance(insert, str):
+            raise ValueError('Splice "insert" must be a string')
+        if start < position or length < 0 or start + length > units:
+            raise ValueError(f'Splice at {start} is out of range or out of order')
+        pieces.append(base[position * 2:start * 2])
+        pieces.append(insert.encode('utf-16-le'))
+        position = start + length
+    pieces.append(base[position * 2:])
+
+    try:
+        return b''.join(pieces).decode('utf-16-le')
+    except UnicodeDecodeError:
+        raise ValueError('Splice boundaries split a character')
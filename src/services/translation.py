@@ -1,71 +1,32 @@
 import os
-import requests
 import json
+import time
+from src.services.translation_cache import translation_cache, cache_key
+from src.services.http_client import http_client
+from src.models.note_translation import NoteTranslation
+from src.services.concurrency import get_executor, default_workers, submit_in_context
+from src.services.chunked_translation import translate_chunked, split_markdown, segment_hash, max_tokens_for
+
+# Bump when the translation prompt changes so cached results are not reused
+TRANSLATION_PROMPT_VERSION = "zh-v1"
+TRANSLATION_MODEL = "gpt-4o-mini"
+
+# Overall time budget for translating all parts of a note (below Vercel's 60s maxDuration)
+TRANSLATION_DEADLINE_SECONDS = float(os.getenv('TRANSLATION_DEADLINE_SECONDS', 55))
 
-# Handle optional dependencies gracefully
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    DOTENV_AVAILABLE = True
-except ImportError:
-    DOTENV_AVAILABLE = False
-    print("python-dotenv package not available, trying manual loader")
-    try:
-        # Manual .env loading
-        env_file = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
-        if os.path.exists(env_file):
-            with open(env_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    os.environ[key] = value
-    except Exception as e:
-        print(f"Manual env loader failed: {e}")
 
 class TranslationService:
     def __init__(self):
         self.token = None
         self.endpoint = "https://models.inference.ai.azure.com/chat/completions"
-        self.model = "gpt-4o-mini"
+        self.model = TRANSLATION_MODEL
         self._initialized = False
         
         # Try initial setup
         self._setup_client()
     
-    def _load_env_variables(self):
-        """Force reload environment variables"""
-        try:
-            # Try dotenv first
-            from dotenv import load_dotenv
-            load_dotenv()
-        except ImportError:
-            # Manual .env loading as fallback
-            try:
-                env_file = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
-                if os.path.exists(env_file):
-                    with open(env_file, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                    
-                    for line in lines:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            os.environ[key] = value
-            except Exception as e:
-                print(f"Failed to load environment variables: {e}")
-    
     def _setup_client(self):
         """Setup the GitHub Copilot API client"""
-        # Force reload environment variables
-        self._load_env_variables()
-        
         self.token = os.getenv("GITHUB_AI_TOKEN")
         print(f"🔑 GitHub AI Token found: {'Yes' if self.token else 'No'}")
         
@@ -93,64 +54,78 @@ class TranslationService:
         
         return self.token is not None and self._initialized
     
-    def translate_to_chinese(self, text):
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+    
+    def _translation_payload(self, text, max_tokens=None):
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a professional translator. Translate the given English text to Chinese (Simplified Chinese). Only return the translated text without any additional explanations or formatting unless the original text contains formatting that should be preserved."
+                },
+                {
+                    "role": "user",
+                    "content": f"Translate this English text to Chinese: {text}"
+                }
+            ],
+            "temperature": 0.3,
+            "top_p": 0.9,
+            "max_tokens": max_tokens or max_tokens_for(text)
+        }
+    
+    def _configuration_error(self, service_name):
+        """Error message describing why the service is not configured"""
+        error_details = []
+        if not self.token:
+            error_details.append("GITHUB_AI_TOKEN not set")
+        if not self._initialized:
+            error_details.append("Service initialization failed")
+        return f"{service_name} service is not properly configured: {', '.join(error_details)}"
+    
+    def translate_to_chinese(self, text, max_tokens=None):
         """
         Translate English text to Chinese using GitHub Copilot AI model via requests
+        
+        This sends ``text`` in a single request; use translate_document() for
+        notes that may be long or contain code blocks.
         """
         try:
             print(f"🌐 Starting translation for text: '{text[:50]}...'")
             
             if not self.is_configured():
-                error_details = []
-                if not self.token:
-                    error_details.append("GITHUB_AI_TOKEN not set")
-                if not self._initialized:
-                    error_details.append("Service initialization failed")
-                
-                error_msg = f"Translation service is not properly configured: {', '.join(error_details)}"
+                error_msg = self._configuration_error("Translation")
                 print(f"❌ {error_msg}")
                 return {"error": error_msg}
             
             if not text or not text.strip():
                 return {"error": "No text provided for translation"}
             
-            print("🚀 Sending request to GitHub AI...")
-            
-            # Prepare the request
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
+            key = cache_key(text, self.model, "chinese", TRANSLATION_PROMPT_VERSION)
+            cached = translation_cache.get(key)
+            if cached is not None:
+                print("⚡ Translation served from cache")
+                return {"translated_text": cached, "cached": True}
             
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a professional translator. Translate the given English text to Chinese (Simplified Chinese). Only return the translated text without any additional explanations or formatting unless the original text contains formatting that should be preserved."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Translate this English text to Chinese: {text}"
-                    }
-                ],
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "max_tokens": 500
-            }
+            print("🚀 Sending request to GitHub AI...")
             
             # Make the API request
-            response = requests.post(
+            response = http_client.post(
                 self.endpoint,
-                headers=headers,
-                json=payload,
-                timeout=30
+                headers=self._headers(),
+                json=self._translation_payload(text, max_tokens),
+                operation="translate"
             )
             
             if response.status_code == 200:
                 data = response.json()
                 translated_text = data["choices"][0]["message"]["content"].strip()
                 print(f"✅ Translation successful: '{translated_text}'")
+                translation_cache.put(key, translated_text, self.model, "chinese")
                 return {"translated_text": translated_text}
             else:
                 error_msg = f"API request failed with status {response.status_code}: {response.text}"
@@ -165,15 +140,135 @@ class TranslationService:
             print(f"Full traceback: {traceback.format_exc()}")
             return {"error": error_msg}
     
+    def translate_parts(self, parts, deadline=TRANSLATION_DEADLINE_SECONDS, memo=None):
+        """
+        Translate several independent texts (e.g. a note's title and content)
+        concurrently, so the caller waits for the slowest part rather than the sum.
+        
+        Long or code-containing texts are split along their Markdown structure
+        and their chunks are translated in parallel too (code blocks are kept
+        as-is); see src/services/chunked_translation.py.
+        
+        Args:
+            parts: dict of part name -> English text
+            deadline: overall time budget in seconds
+            memo: optional translation memory (paragraph hash -> translation);
+                paragraphs found in it are reused instead of re-translated
+        
+        Returns a dict of part name -> {"translated_text", "chunks", "cached_chunks",
+        "reused_chunks", "memo"}; parts that failed or missed the deadline carry
+        an "error" key.
+        """
+        executor = get_executor("translate", default_workers())
+        return translate_chunked(parts, self.translate_to_chinese, executor, deadline, memo=memo)
+    
+    def translate_note(self, note, translate_title=True, translate_content=True, deadline=TRANSLATION_DEADLINE_SECONDS):
+        """
+        Translate a note's title and/or content, reusing and updating the
+        note's stored paragraph translations.
+        
+        Returns {"translations": {part: text}, "incremental": {...}} on success,
+        or {"error", "errors", "timed_out"} if any part failed.
+        """
+        parts = {}
+        if translate_title and note.title:
+            parts['title'] = note.title
+        if translate_content and note.content:
+            parts['content'] = note.content
+        
+        # Paragraphs translated before (and unchanged since) are reused from storage
+        memo = NoteTranslation.load_memo(note.id, 'chinese', TRANSLATION_PROMPT_VERSION)
+        part_results = self.translate_parts(parts, deadline, memo=memo) if parts else {}
+        
+        errors = {name: part['error'] for name, part in part_results.items() if 'error' in part}
+        if errors:
+            failed = 'title' if 'title' in errors else 'content'
+            return {
+                "error": f"{failed.capitalize()} translation failed",
+                "details": errors[failed],
+                "errors": errors,
+                "timed_out": any(part.get('timed_out') for part in part_results.values())
+            }
+        
+        new_memo = {}
+        for part in part_results.values():
+            new_memo.update(part['memo'])
+        if part_results and new_memo != memo:
+            NoteTranslation.save_memo(note.id, 'chinese', TRANSLATION_PROMPT_VERSION, new_memo)
+        
+        return {
+            "translations": {name: part['translated_text'] for name, part in part_results.items()},
+            "incremental": {
+                "reused_chunks": sum(part['reused_chunks'] for part in part_results.values()),
+                "translated_chunks": sum(part['chunks'] - part['reused_chunks'] for part in part_results.values())
+            }
+        }
+    
+    def translate_document(self, text, deadline=TRANSLATION_DEADLINE_SECONDS):
+        """Translate a whole (possibly long) Markdown document to Chinese"""
+        if not text or not text.strip():
+            return {"error": "No text provided for translation"}
+        result = self.translate_parts({"text": text}, deadline)["text"]
+        result.pop("memo", None)
+        return result
+    
     def translate_text(self, text, target_language="chinese"):
         """
         General translation function that can be extended for other languages
         """
         if target_language.lower() in ["chinese", "zh", "cn"]:
-            return self.translate_to_chinese(text)
+            return self.translate_document(text)
         else:
             return {"error": f"Translation to {target_language} is not supported yet"}
     
+    def _auto_complete_payload(self, title, content, completion_type):
+        # Prepare different prompts based on completion type
+        system_prompts = {
+            "suggestions": "You are a helpful writing assistant. Analyze the given note content and provide 3-5 relevant suggestions to expand or improve the content. Focus on adding value, depth, and useful details. Respond with a JSON object containing 'suggestions' array.",
+            "corrections": "You are a professional editor. Review the given note content and provide helpful corrections and improvements for grammar, clarity, and structure. Respond with a JSON object containing 'corrections' array with objects having 'issue' and 'suggestion' fields.",
+            "continuation": "You are a creative writing assistant. Based on the existing note content, continue writing in the same style and tone. Provide 2-3 paragraphs that naturally extend the content. Respond with a JSON object containing 'continuation' field."
+        }
+        
+        system_prompt = system_prompts.get(completion_type, system_prompts["suggestions"])
+        
+        # Create user prompt based on available content
+        if title and content:
+            user_prompt = f"Note Title: {title}\n\nNote Content:\n{content}\n\nPlease provide {completion_type} for this note."
+        elif title:
+            user_prompt = f"Note Title: {title}\n\nI have this title but no content yet. Please provide {completion_type} for what this note could contain."
+        else:
+            user_prompt = f"Note Content:\n{content}\n\nPlease provide {completion_type} for this note content."
+        
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ],
+            "temperature": 0.7,  # Higher creativity for suggestions
+            "top_p": 0.9,
+            "max_tokens": 800
+        }
+    
+    def auto_complete_result(self, ai_response, completion_type):
+        """Wrap the model's reply, parsed as JSON when possible"""
+        try:
+            parsed_response = json.loads(ai_response)
+        except json.JSONDecodeError:
+            # If JSON parsing fails, return as plain text
+            parsed_response = {"text": ai_response}
+        return {
+            "success": True,
+            "type": completion_type,
+            "result": parsed_response
+        }
+    
     def auto_complete_note(self, title="", content="", completion_type="suggestions"):
         """
         Auto-complete note content using AI
@@ -187,91 +282,28 @@ class TranslationService:
             print(f"🤖 Starting auto-completion for note: '{title[:30]}...'")
             
             if not self.is_configured():
-                error_details = []
-                if not self.token:
-                    error_details.append("GITHUB_AI_TOKEN not set")
-                if not self._initialized:
-                    error_details.append("Service initialization failed")
-                
-                error_msg = f"Auto-complete service is not properly configured: {', '.join(error_details)}"
+                error_msg = self._configuration_error("Auto-complete")
                 print(f"❌ {error_msg}")
                 return {"error": error_msg}
             
             if not title and not content:
                 return {"error": "Please provide either a title or some content to work with"}
             
-            # Prepare different prompts based on completion type
-            system_prompts = {
-                "suggestions": "You are a helpful writing assistant. Analyze the given note content and provide 3-5 relevant suggestions to expand or improve the content. Focus on adding value, depth, and useful details. Respond with a JSON object containing 'suggestions' array.",
-                "corrections": "You are a professional editor. Review the given note content and provide helpful corrections and improvements for grammar, clarity, and structure. Respond with a JSON object containing 'corrections' array with objects having 'issue' and 'suggestion' fields.",
-                "continuation": "You are a creative writing assistant. Based on the existing note content, continue writing in the same style and tone. Provide 2-3 paragraphs that naturally extend the content. Respond with a JSON object containing 'continuation' field."
-            }
-            
-            system_prompt = system_prompts.get(completion_type, system_prompts["suggestions"])
-            
-            # Create user prompt based on available content
-            if title and content:
-                user_prompt = f"Note Title: {title}\n\nNote Content:\n{content}\n\nPlease provide {completion_type} for this note."
-            elif title:
-                user_prompt = f"Note Title: {title}\n\nI have this title but no content yet. Please provide {completion_type} for what this note could contain."
-            else:
-                user_prompt = f"Note Content:\n{content}\n\nPlease provide {completion_type} for this note content."
-            
             print("🚀 Sending auto-completion request to GitHub AI...")
             
-            # Prepare the request
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ],
-                "temperature": 0.7,  # Higher creativity for suggestions
-                "top_p": 0.9,
-                "max_tokens": 800
-            }
-            
             # Make the API request
-            response = requests.post(
+            response = http_client.post(
                 self.endpoint,
-                headers=headers,
-                json=payload,
-                timeout=30
+                headers=self._headers(),
+                json=self._auto_complete_payload(title, content, completion_type),
+                operation=completion_type
             )
             
             if response.status_code == 200:
                 data = response.json()
                 ai_response = data["choices"][0]["message"]["content"].strip()
-                
-                # Try to parse as JSON first, fallback to text if needed
-                try:
-                    import json
-                    parsed_response = json.loads(ai_response)
-                    print(f"✅ Auto-completion successful: {completion_type}")
-                    return {
-                        "success": True,
-                        "type": completion_type,
-                        "result": parsed_response
-                    }
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, return as plain text
-                    print(f"✅ Auto-completion successful (plain text): {completion_type}")
-                    return {
-                        "success": True,
-                        "type": completion_type,
-                        "result": {"text": ai_response}
-                    }
+                print(f"✅ Auto-completion successful: {completion_type}")
+                return self.auto_complete_result(ai_response, completion_type)
             else:
                 error_msg = f"API request failed with status {response.status_code}: {response.text}"
                 print(f"❌ {error_msg}")
@@ -285,5 +317,131 @@ class TranslationService:
             print(f"Full traceback: {traceback.format_exc()}")
             return {"error": error_msg}
 
+    def stream_chat(self, payload, operation=None):
+        """
+        Yield the content deltas of a streamed chat completion as they arrive.
+        Raises RuntimeError if the API rejects the request.
+        """
+        response = http_client.post(
+            self.endpoint,
+            headers=self._headers(),
+            json={**payload, "stream": True},
+            stream=True,
+            operation=operation
+        )
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f"API request failed with status {response.status_code}: {response.text}")
+            
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices:
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+        finally:
+            response.close()
+    
+    def stream_translation(self, text):
+        """
+        Yield the Chinese translation of ``text`` piece by piece (single request).
+        Cached translations are yielded whole; completed ones are cached.
+        Raises RuntimeError if the service is unavailable or the request fails.
+        """
+        if not self.is_configured():
+            raise RuntimeError(self._configuration_error("Translation"))
+        if not text or not text.strip():
+            raise RuntimeError("No text provided for translation")
+        
+        key = cache_key(text, self.model, "chinese", TRANSLATION_PROMPT_VERSION)
+        cached = translation_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        pieces = []
+        for delta in self.stream_chat(self._translation_payload(text), operation="translate"):
+            pieces.append(delta)
+            yield delta
+        translation_cache.put(key, "".join(pieces).strip(), self.model, "chinese")
+    
+    def stream_document(self, text, deadline=TRANSLATION_DEADLINE_SECONDS, memo=None, memo_out=None):
+        """
+        Yield the translation of a (possibly long) Markdown document in order.
+        
+        The first chunk that needs the model is streamed token by token while
+        the remaining ones are translated concurrently in the background and
+        emitted as soon as everything before them has been sent.
+        
+        Args:
+            memo: optional translation memory (paragraph hash -> translation);
+                known paragraphs are emitted straight from it
+            memo_out: optional dict that receives the hash -> translation
+                entries of this document, for saving as the next memo
+        """
+        started = time.monotonic()
+        segments = split_markdown(text, whole_if_short=memo is None)
+        memo = memo or {}
+        pending = [
+            index for index, segment in enumerate(segments)
+            if segment.translatable and segment_hash(segment.text) not in memo
+        ]
+        first = pending[0] if pending else None
+        
+        executor = get_executor("translate", default_workers())
+        futures = {
+            index: submit_in_context(executor, lambda text=segments[index].text: self.translate_to_chinese(text))
+            for index in pending[1:]
+        }
+        try:
+            for index, segment in enumerate(segments):
+                if not segment.translatable:
+                    yield segment.text
+                    continue
+                
+                key = segment_hash(segment.text)
+                if key in memo:
+                    translated_text = memo[key]
+                    yield translated_text
+                elif index == first:
+                    pieces = []
+                    for delta in self.stream_translation(segment.text):
+                        pieces.append(delta)
+                        yield delta
+                    translated_text = "".join(pieces).strip()
+                else:
+                    remaining = max(0, deadline - (time.monotonic() - started))
+                    try:
+                        result = futures[index].result(timeout=remaining)
+                    except TimeoutError:
+                        raise RuntimeError(f"Translation timed out after {deadline:g}s")
+                    if "error" in result:
+                        raise RuntimeError(result["error"])
+                    translated_text = result["translated_text"]
+                    yield translated_text
+                
+                if memo_out is not None:
+                    memo_out[key] = translated_text
+        finally:
+            for future in futures.values():
+                future.cancel()
+    
+    def stream_auto_complete(self, title="", content="", completion_type="suggestions"):
+        """
+        Yield the raw auto-completion text as it is generated; pass the joined
+        text to auto_complete_result() for the same shape as auto_complete_note().
+        """
+        if not self.is_configured():
+            raise RuntimeError(self._configuration_error("Auto-complete"))
+        if not title and not content:
+            raise RuntimeError("Please provide either a title or some content to work with")
+        
+        yield from self.stream_chat(self._auto_complete_payload(title, content, completion_type), operation=completion_type)
+
 # Create a global instance
 translation_service = TranslationService()
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Two-tier, content-addressed cache for LLM translations.
+
+Entries are keyed by a SHA-256 of (normalized text, model, target language,
+prompt version), so a changed prompt or model never serves stale output.
+The first tier is a bounded in-process LRU; the second is the
+``translation_cache`` table, shared by every worker and kept across restarts.
+The database tier is only used inside a Flask app context.
+"""
+import os
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from flask import has_app_context
+from src.services.metrics import record_cache_lookup
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def normalize_text(text):
+    """Normalize text for hashing: NFC, Unix newlines, no outer whitespace"""
+    text = unicodedata.normalize('NFC', text)
+    return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+def cache_key(text, model, target_language, prompt_version):
+    """Content hash identifying one translation request"""
+    parts = [normalize_text(text), model, target_language.lower(), prompt_version]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, max_entries=None, persist=None):
+        if max_entries is None:
+            max_entries = int(os.getenv('TRANSLATION_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+        if persist is None:
+            persist = os.getenv('TRANSLATION_CACHE_PERSIST', '1') != '0'
+
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached translation for ``key`` or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                record_cache_lookup('translation', True)
+                return self._entries[key]
+
+        translated_text = self._load(key)
+        with self._lock:
+            if translated_text is None:
+                self.misses += 1
+                record_cache_lookup('translation', False)
+                return None
+            self.db_hits += 1
+            record_cache_lookup('translation', True)
+            self._remember(key, translated_text)
+        return translated_text
+
+    def put(self, key, translated_text, model, target_language):
+        """Store a translation in both tiers"""
+        with self._lock:
+            self._remember(key, translated_text)
+        self._store(key, translated_text, model, target_language)
+
+    def clear(self):
+        """Drop the in-process tier (the database tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            hits = self.memory_hits + self.db_hits
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'persistent': self.persist,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_ratio': round(hits / lookups, 4) if lookups else None
+            }
+
+    def _remember(self, key, translated_text):
+        # Caller holds the lock
+        self._entries[key] = translated_text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key):
+        if not self.persist or not has_app_context():
+            return None
+        try:
+            from src.models.translation_cache import TranslationCacheEntry
+            from src.models.user import db
+            entry = db.session.get(TranslationCacheEntry, key)
+            return entry.translated_text if entry else None
+        except Exception as e:
+            print(f"❌ Translation cache lookup failed: {e}")
+            return None
+
+    def _store(self, key, translated_text, model, target_language):
+        if not self.persist or not has_app_context():
+            return
+        from src.models.translation_cache import TranslationCacheEntry
+        from src.models.user import db
+        try:
+            # merge() makes concurrent writers of the same key harmless
+            db.session.merge(TranslationCacheEntry(
+                key=key,
+                model=model,
+                target_language=target_language,
+                translated_text=translated_text
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Translation cache store failed: {e}")
+
+
+# Create a global instance
+translation_cache = TranslationCache()
@@ -0,0 +1,173 @@
+"""
+Streaming ZIP writer.
+
+Produces a ZIP archive piece by piece, so it can be sent to the client while
+it is being built and never has to be held in memory or written to disk.
+Each entry is compressed completely before its local header is written, so
+the CRC and sizes go straight into the header and no data descriptors or
+seeking are needed. This is also what lets entries be rendered and
+compressed on a thread pool (zlib releases the GIL) while the archive
+itself stays strictly ordered.
+
+ZIP64 records are added automatically when an archive or entry outgrows
+the classic 4 GiB / 65535-entry limits. Only the central directory (about
+100 bytes per entry) is kept until the end.
+"""
+import zlib
+import struct
+from collections import deque, namedtuple
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Sizes and offsets from ZIP64_LIMIT on, and entry counts from ZIP_COUNT_LIMIT
+# on, need ZIP64 records; the classic field then holds the all-ones marker
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_COUNT_LIMIT = 0xFFFF
+ZIP64_MARKER = 0xFFFFFFFF
+ZIP_COUNT_MARKER = 0xFFFF
+UTF8_FLAG = 0x0800
+
+CompressedEntry = namedtuple('CompressedEntry', ['name', 'date_time', 'method', 'crc', 'size', 'data'])
+
+
+def compress_entry(name, data, date_time, level=6):
+    """Deflate one file's bytes; falls back to storing when compression does not help"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    crc = zlib.crc32(data)
+    if len(compressed) >= len(data):
+        return CompressedEntry(name, date_time, ZIP_STORED, crc, len(data), data)
+    return CompressedEntry(name, date_time, ZIP_DEFLATED, crc, len(data), compressed)
+
+
+def _dos_date_time(date_time):
+    if date_time is None or date_time.year < 1980:
+        return 0, (1 << 5) | 1  # 1980-01-01 00:00
+    dos_time = (date_time.hour << 11) | (date_time.minute << 5) | (date_time.second // 2)
+    dos_date = ((date_time.year - 1980) << 9) | (date_time.month << 5) | date_time.day
+    return dos_time, dos_date
+
+
+class ZipStreamWriter:
+    """Serializes compressed entries and, at the end, the central directory"""
+
+    def __init__(self):
+        self.offset = 0
+        self.central_directory = []
+
+    def _emit(self, data):
+        self.offset += len(data)
+        return data
+
+    def add(self, entry):
+        """Return the local header and data of ``entry`` (a CompressedEntry)"""
+        name = entry.name.encode('utf-8')
+        dos_time, dos_date = _dos_date_time(entry.date_time)
+        compressed_size = len(entry.data)
+        zip64 = entry.size >= ZIP64_LIMIT or compressed_size >= ZIP64_LIMIT
+
+        extra = struct.pack('<HHQQ', 0x0001, 16, entry.size, compressed_size) if zip64 else b''
+        header = struct.pack(
+            '<IHHHHHIIIHH',
+            0x04034b50,
+            45 if zip64 else 20,
+            UTF8_FLAG,
+            entry.method,
+            dos_time,
+            dos_date,
+            entry.crc,
+            ZIP64_MARKER if zip64 else compressed_size,
+            ZIP64_MARKER if zip64 else entry.size,
+            len(name),
+            len(extra),
+        )
+        self.central_directory.append((name, entry, dos_time, dos_date, compressed_size, self.offset))
+        return self._emit(header + name + extra + entry.data)
+
+    def finish(self):
+        """Return the central directory and end records"""
+        directory = bytearray()
+        start = self.offset
+        for name, entry, dos_time, dos_date, compressed_size, offset in self.central_directory:
+            zip64_fields = []
+            if entry.size >= ZIP64_LIMIT:
+                zip64_fields.append(entry.size)
+            if compressed_size >= ZIP64_LIMIT:
+                zip64_fields.append(compressed_size)
+            if offset >= ZIP64_LIMIT:
+                zip64_fields.append(offset)
+            extra = b''
+            if zip64_fields:
+                extra = struct.pack(f'<HH{len(zip64_fields)}Q', 0x0001, 8 * len(zip64_fields), *zip64_fields)
+            directory += struct.pack(
+                '<IHHHHHHIIIHHHHHII',
+                0x02014b50,
+                (3 << 8) | 45,  # made by: Unix, spec 4.5
+                45 if zip64_fields else 20,
+                UTF8_FLAG,
+                entry.method,
+                dos_time,
+                dos_date,
+                entry.crc,
+                ZIP64_MARKER if compressed_size >= ZIP64_LIMIT else compressed_size,
+                ZIP64_MARKER if entry.size >= ZIP64_LIMIT else entry.size,
+                len(name),
+                len(extra),
+                0, 0, 0,
+                0o100644 << 16,  # regular file, rw-r--r--
+                ZIP64_MARKER if offset >= ZIP64_LIMIT else offset,
+            )
+            directory += name + extra
+
+        count = len(self.central_directory)
+        size = len(directory)
+        end = bytearray()
+        if count >= ZIP_COUNT_LIMIT or size >= ZIP64_LIMIT or start >= ZIP64_LIMIT:
+            zip64_end_offset = start + size
+            end += struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, size, start)
+            end += struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1)
+        end += struct.pack(
+            '<IHHHHIIH',
+            0x06054b50, 0, 0,
+            ZIP_COUNT_MARKER if count >= ZIP_COUNT_LIMIT else count,
+            ZIP_COUNT_MARKER if count >= ZIP_COUNT_LIMIT else count,
+            ZIP64_MARKER if size >= ZIP64_LIMIT else size,
+            ZIP64_MARKER if start >= ZIP64_LIMIT else start,
+            0,
+        )
+        self.central_directory = []
+        return self._emit(bytes(directory) + bytes(end))
+
+
+def stream_zip(files, executor=None, window=8):
+    """
+    Yield a ZIP archive of ``files``, an iterable of (name, date_time, render)
+    where ``render()`` returns the file's bytes.
+
+    With an executor, up to ``window`` files are rendered and compressed
+    concurrently; entries are still written in order and at most ``window``
+    of them are held in memory at a time.
+    """
+    writer = ZipStreamWriter()
+
+    def build(name, date_time, render):
+        return compress_entry(name, render(), date_time)
+
+    if executor is None:
+        for name, date_time, render in files:
+            yield writer.add(build(name, date_time, render))
+    else:
+        pending = deque()
+        try:
+            for name, date_time, render in files:
+                pending.append(executor.submit(build, name, date_time, render))
+                if len(pending) >= window:
+                    yield writer.add(pending.popleft().result())
+            while pending:
+                yield writer.add(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    yield writer.finish()
@@ -6,6 +6,56 @@ import sys
 import json
 import traceback
 import requests
+from src.services.translation_cache import translation_cache, cache_key
+from src.services.http_client import http_client
+from src.services.concurrency import get_executor, default_workers
+from src.services.chunked_translation import translate_chunked, max_tokens_for
+
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_SYSTEM_PROMPT = "You are a professional translator. Translate the given English text to Chinese (Simplified Chinese). Only return the translated text without any additional explanations."
+
+# Bump when TRANSLATION_SYSTEM_PROMPT changes so cached results are not reused
+TRANSLATION_PROMPT_VERSION = "zh-vercel-v1"
+
+# Overall time budget for all parts, leaving headroom under vercel.json's maxDuration of 60s
+TRANSLATION_DEADLINE_SECONDS = float(os.getenv('TRANSLATION_DEADLINE_SECONDS', 55))
+
+def translate_with_cache(text, endpoint, headers, max_tokens=None):
+    """
+    Translate text to Chinese, consulting the shared translation cache first.
+    Returns (translated_text, error, cached).
+    """
+    key = cache_key(text, TRANSLATION_MODEL, "chinese", TRANSLATION_PROMPT_VERSION)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        return cached, None, True
+    
+    payload = {
+        "model": TRANSLATION_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": TRANSLATION_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": f"Translate this English text to Chinese: {text}"
+            }
+        ],
+        "temperature": 0.3,
+        "top_p": 0.9,
+        "max_tokens": max_tokens or max_tokens_for(text)
+    }
+    
+    response = http_client.post(endpoint, headers=headers, json=payload, operation='translate')
+    
+    if response.status_code != 200:
+        return None, f"{response.status_code} - {response.text}", False
+    
+    data = response.json()
+    translated_text = data["choices"][0]["message"]["content"].strip()
+    translation_cache.put(key, translated_text, TRANSLATION_MODEL, "chinese")
+    return translated_text, None, False
 
 def handle_translation_request(note_id, request_data):
     """
@@ -65,61 +115,41 @@ def handle_translation_request(note_id, request_data):
             
             translations = {}
             
+            # Title and content are independent, so translate them concurrently;
+            # long content is additionally split into chunks translated in parallel
+            parts = {}
             if translate_title and note.title:
-                payload = {
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a professional translator. Translate the given English text to Chinese (Simplified Chinese). Only return the translated text without any additional explanations."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Translate this English text to Chinese: {note.title}"
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "max_tokens": 500
-                }
-                
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    translated_title = data["choices"][0]["message"]["content"].strip()
-                    translations["title"] = translated_title
-                    result["debug_info"]["title_translation_success"] = True
-                else:
-                    result["errors"].append(f"Title translation API failed: {response.status_code} - {response.text}")
-            
+                parts["title"] = note.title
             if translate_content and note.content:
-                payload = {
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a professional translator. Translate the given English text to Chinese (Simplified Chinese). Only return the translated text without any additional explanations."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Translate this English text to Chinese: {note.content}"
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "max_tokens": 1000
-                }
-                
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    translated_content = data["choices"][0]["message"]["content"].strip()
-                    translations["content"] = translated_content
-                    result["debug_info"]["content_translation_success"] = True
-                else:
-                    result["errors"].append(f"Content translation API failed: {response.status_code} - {response.text}")
+                parts["content"] = note.content
+            
+            def translate_chunk(text):
+                translated_text, error, cached = translate_with_cache(text, endpoint, headers)
+                if error is not None:
+                    return {"error": f"API failed: {error}"}
+                return {"translated_text": translated_text, "cached": cached}
+            
+            # Paragraphs translated before (and unchanged since) are reused from storage
+            from src.models.note_translation import NoteTranslation
+            memo = NoteTranslation.load_memo(note.id, "chinese", TRANSLATION_PROMPT_VERSION)
+            
+            executor = get_executor("translate", default_workers())
+            outcomes = translate_chunked(parts, translate_chunk, executor, TRANSLATION_DEADLINE_SECONDS, memo=memo) if parts else {}
+            
+            new_memo = {}
+            for name, outcome in outcomes.items():
+                if "error" in outcome:
+                    result["errors"].append(f"{name.capitalize()} translation failed: {outcome['error']}")
+                    continue
+                translations[name] = outcome["translated_text"]
+                new_memo.update(outcome["memo"])
+                result["debug_info"][f"{name}_translation_success"] = True
+                result["debug_info"][f"{name}_chunks"] = outcome["chunks"]
+                result["debug_info"][f"{name}_cached_chunks"] = outcome["cached_chunks"]
+                result["debug_info"][f"{name}_reused_chunks"] = outcome["reused_chunks"]
+            
+            if outcomes and not result["errors"] and new_memo != memo:
+                NoteTranslation.save_memo(note.id, "chinese", TRANSLATION_PROMPT_VERSION, new_memo)
             
             # Success if we have any translations
             if translations:
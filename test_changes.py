@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Change feed tests: notes and tombstones merge in change order, and compaction forces a reset
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Never write into the bundled src/database/app.db
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+
+def test_changes_since():
+    """Paging through the feed returns every change once, oldest first, then resets after compaction"""
+    from src.main import app
+    from src.models.user import db
+    from src.models.note import Note
+    from src.services.changes import changes_since, current_cursor, compact_tombstones
+
+    with app.app_context():
+        # A cursor of 0 means a full load, so start from a real position
+        db.session.add(Note(title='Feed seed', content='Seed'))
+        db.session.commit()
+        start = current_cursor(db.session)
+        first, second, third = (Note(title=f'Feed {i}', content=f'Body {i}') for i in range(3))
+        db.session.add_all([first, second, third])
+        db.session.commit()
+        second_id = second.id
+        db.session.delete(second)
+        db.session.commit()
+        first.content = 'Edited'
+        db.session.commit()
+
+        # Created third, deleted second, edited first; each note appears once, at its latest change
+        changes = changes_since(db.session, start, limit=10)
+        assert [note['id'] for note in changes['notes']] == [third.id, first.id]
+        assert changes['deleted'] == [second_id]
+        assert changes['cursor'] == first.change_seq == current_cursor(db.session)
+        assert not changes['has_more'] and not changes['reset']
+        assert 'content' not in changes['notes'][0]
+        assert changes_since(db.session, start, limit=10, full=True)['notes'][1]['content'] == 'Edited'
+
+        # Two at a time: the tombstone sits between the two notes
+        page = changes_since(db.session, start, limit=2)
+        assert [note['id'] for note in page['notes']] == [third.id]
+        assert page['deleted'] == [second_id] and page['has_more']
+        page = changes_since(db.session, page['cursor'], limit=2)
+        assert [note['id'] for note in page['notes']] == [first.id]
+        assert page['deleted'] == [] and not page['has_more']
+
+        # Nothing new: the cursor stays put
+        now = current_cursor(db.session)
+        assert changes_since(db.session, now)['cursor'] == now
+        assert changes_since(db.session, now + 5)['cursor'] == now + 5
+
+        # A full load (since=0) never lists tombstones
+        assert second_id not in changes_since(db.session, 0, limit=10 ** 6)['deleted']
+
+        # Once the tombstone is compacted, an older cursor must reload from scratch
+        assert compact_tombstones(db.session, 0) >= 1
+        assert changes_since(db.session, start) == {
+            'notes': [], 'deleted': [], 'cursor': 0, 'has_more': False, 'reset': True
+        }
+        assert not changes_since(db.session, 0)['reset']
+        assert not changes_since(db.session, now)['reset']
+
+
+if __name__ == "__main__":
+    test_changes_since()
+    print("✅ Change feed tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Markdown chunking tests: segments must always join back to the original note
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.chunked_translation import split_markdown, Segment
+
+NOTE = (
+    '# Title\n'
+    '\n'
+    'First paragraph. It has two sentences.\n'
+    'And a second line.\n'
+    '\n\n'
+    '```python\n'
+    'print("not translated")\n'
+    '\n'
+    '```\n'
+    '## Heading\n'
+    'Last paragraph \U0001f600 without a trailing newline'
+)
+
+
+def check_joins(segments, text):
+    assert ''.join(segment.text for segment in segments) == text
+    assert all(segment.text for segment in segments)
+
+
+def test_short_text_is_one_segment():
+    """Short, code-free text is sent whole, unless asked to split it"""
+    text = '# Title\n\nA short note.\n'
+    assert split_markdown(text, max_chars=100) == [Segment(text, True)]
+    assert split_markdown('', max_chars=100) == [Segment('', True)]
+    segments = split_markdown(text, max_chars=100, whole_if_short=False)
+    check_joins(segments, text)
+    assert [s.text for s in segments if s.translatable] == ['# Title', 'A short note.']
+
+
+def test_code_fences_and_blank_lines_are_kept():
+    """Fenced code (even with blank lines inside) and whitespace are not translated"""
+    segments = split_markdown(NOTE, max_chars=1000)
+    check_joins(segments, NOTE)
+    assert [s.text for s in segments if s.translatable] == [
+        '# Title',
+        'First paragraph. It has two sentences.\nAnd a second line.',
+        '## Heading',
+        'Last paragraph \U0001f600 without a trailing newline',
+    ]
+    assert '\n\n\n```python\nprint("not translated")\n\n```\n' in [s.text for s in segments if not s.translatable]
+    # Adjacent non-translatable segments are merged
+    assert all(a.translatable or b.translatable for a, b in zip(segments, segments[1:]))
+
+
+def test_unclosed_fence_runs_to_the_end():
+    """An unterminated fence swallows the rest of the note rather than losing it"""
+    text = 'Intro\n~~~\ncode\nmore code'
+    segments = split_markdown(text, max_chars=1000)
+    check_joins(segments, text)
+    assert segments == [Segment('Intro', True), Segment('\n~~~\ncode\nmore code', False)]
+
+
+def test_long_paragraphs_are_split_to_max_chars():
+    """Oversized paragraphs split at lines, then sentences, then words, then hard cuts"""
+    long_text = (
+        'One sentence here. Another sentence follows! ' * 10 + '\n'
+        + 'word ' * 60 + '\n'
+        + 'x' * 95 + '\n\n'
+        + 'Tail.'
+    )
+    for max_chars in (10, 25, 40):
+        segments = split_markdown(long_text, max_chars=max_chars)
+        check_joins(segments, long_text)
+        assert all(len(s.text) <= max_chars for s in segments if s.translatable)
+        assert all(not s.text.strip() for s in segments if not s.translatable)
+    sentences = [s.text for s in split_markdown('A b c. D e f. G h i.', max_chars=8, whole_if_short=False) if s.translatable]
+    assert sentences == ['A b c.', 'D e f.', 'G h i.']
+
+
+if __name__ == "__main__":
+    test_short_text_is_one_segment()
+    test_code_fences_and_blank_lines_are_kept()
+    test_unclosed_fence_runs_to_the_end()
+    test_long_paragraphs_are_split_to_max_chars()
+    print("✅ Markdown chunking tests passed")
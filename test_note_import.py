@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import endpoint tests: ZIP archives sent as the raw request body
+"""
+
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Never import into the bundled src/database/app.db
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+
+def make_zip(notes):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, text in notes.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+def test_raw_zip_body():
+    """A ZIP posted as the raw body imports like a multipart upload"""
+    from src.main import app
+    from src.models.user import db
+    from src.models.note import Note
+    from src.models.note_import import NoteImport
+
+    body = make_zip({
+        'first.md': '# Raw zip first\n\nFirst body',
+        'nested/second.md': '# Raw zip second\n\nSecond body',
+        'ignored.txt': 'not markdown',
+    })
+    client = app.test_client()
+    response = client.post('/api/notes/import?filename=notes.zip', data=body,
+                           content_type='application/zip')
+    assert response.status_code == 201, response.get_json()
+    stats = response.get_json()
+    assert stats['imported'] == 2
+
+    with app.app_context():
+        notes = Note.query.filter(Note.title.in_(['Raw zip first', 'Raw zip second'])).all()
+        assert sorted(note.content for note in notes)[-2:] == ['First body', 'Second body']
+        assert db.session.get(NoteImport, stats['import_id']).status == 'completed'
+
+
+def test_raw_invalid_zip_body():
+    """A raw body that is not a ZIP archive is rejected as bad input"""
+    from src.main import app
+
+    response = app.test_client().post('/api/notes/import?format=zip', data=b'not a zip archive',
+                                      content_type='application/zip')
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_raw_zip_body()
+    test_raw_invalid_zip_body()
+    print("✅ Import tests passed")
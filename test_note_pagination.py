@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Note listing tests: keyset cursors round-trip and pages never skip or repeat notes
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Never write into the bundled src/database/app.db
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+
+def test_cursor_round_trip():
+    """decode_cursor returns exactly what encode_cursor was given, microseconds included"""
+    from src.routes.note import encode_cursor, decode_cursor
+
+    for updated_at, note_id in (
+        (datetime(2024, 5, 17, 13, 45, 30, 123456), 42),
+        (datetime(1999, 12, 31), 1),
+        (datetime(2024, 1, 1, 0, 0, 1), 10 ** 12),
+    ):
+        cursor = encode_cursor(updated_at, note_id)
+        assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+        assert decode_cursor(cursor) == (updated_at, note_id)
+
+
+def test_invalid_cursors():
+    """Malformed cursors raise ValueError, which the listing turns into a 400"""
+    from src.routes.note import encode_cursor, decode_cursor
+    from src.main import app
+
+    for cursor in ('', 'not base64!', 'bm90IGpzb24', encode_cursor(None, 1), 'WyJ4IiwgMV0', 'WzFd'):
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            decode_cursor(cursor)
+
+    response = app.test_client().get('/api/notes?limit=2&cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert 'Invalid cursor' in response.get_json()['error']
+
+
+def test_pages_with_tied_timestamps():
+    """Notes sharing updated_at are ordered by id and each one is listed exactly once"""
+    from src.main import app
+    from src.models.user import db
+    from src.models.note import Note
+
+    # Far in the future so these notes come first in the listing
+    tied = datetime(2100, 1, 1, 12, 0, 0)
+    with app.app_context():
+        notes = [Note(title=f'Tied {i}', content=f'Body {i}', updated_at=tied) for i in range(5)]
+        newest = Note(title='Newest', content='Body', updated_at=datetime(2100, 1, 1, 12, 0, 0, 1))
+        db.session.add_all(notes + [newest])
+        db.session.commit()
+        expected = [newest.id] + sorted((note.id for note in notes), reverse=True)
+
+    client = app.test_client()
+    seen = []
+    cursor = None
+    while len(seen) < len(expected):
+        query = '/api/notes?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(query).get_json()
+        assert len(page['notes']) <= 2
+        seen.extend(note['id'] for note in page['notes'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen[:len(expected)] == expected
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_invalid_cursors()
+    test_pages_with_tied_timestamps()
+    print("✅ Note pagination tests passed")
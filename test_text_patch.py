@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Text patch tests: splices use UTF-16 offsets and bad splices never corrupt the body
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.text_patch import apply_splices
+
+# 'a', a grinning face (two UTF-16 code units), 'b'
+ASTRAL = 'a\U0001f600b'
+
+
+def test_basic_splices():
+    """Inserts, deletes and replacements apply against the base text offsets"""
+    assert apply_splices('hello world', []) == 'hello world'
+    assert apply_splices('hello world', [{'start': 5, 'insert': ','}]) == 'hello, world'
+    assert apply_splices('hello world', [{'start': 0, 'delete': 6}]) == 'world'
+    assert apply_splices('hello world', [
+        {'start': 0, 'delete': 5, 'insert': 'HELLO'},
+        {'start': 6, 'delete': 5, 'insert': 'there'},
+    ]) == 'HELLO there'
+    # Adjacent splices: the second starts where the first one's delete ends
+    assert apply_splices('abcdef', [
+        {'start': 1, 'delete': 2, 'insert': 'X'},
+        {'start': 3, 'delete': 1, 'insert': 'Y'},
+    ]) == 'aXYef'
+    assert apply_splices('abc', [{'start': 3, 'insert': 'd'}]) == 'abcd'
+
+
+def test_astral_characters_count_two_units():
+    """Offsets are JavaScript string indices: characters beyond the BMP take two"""
+    assert apply_splices(ASTRAL, [{'start': 1, 'delete': 2}]) == 'ab'
+    assert apply_splices(ASTRAL, [{'start': 3, 'insert': '!'}]) == 'a\U0001f600!b'
+    assert apply_splices(ASTRAL, [{'start': 4, 'insert': '\U0001f389'}]) == ASTRAL + '\U0001f389'
+    assert apply_splices(ASTRAL + 'é', [{'start': 4, 'delete': 1, 'insert': 'e'}]) == ASTRAL + 'e'
+
+
+def test_splitting_a_surrogate_pair_is_rejected():
+    """A splice boundary inside an astral character must not produce a lone surrogate"""
+    for splices in (
+        [{'start': 2, 'insert': 'x'}],
+        [{'start': 1, 'delete': 1}],
+        [{'start': 2, 'delete': 1}],
+    ):
+        with pytest.raises(ValueError, match='split a character'):
+            apply_splices(ASTRAL, splices)
+
+
+def test_overlapping_and_out_of_range_splices_are_rejected():
+    """Splices must be ascending, non-overlapping and inside the base text"""
+    for splices in (
+        [{'start': 0, 'delete': 3}, {'start': 2, 'insert': 'x'}],
+        [{'start': 3, 'insert': 'x'}, {'start': 1, 'insert': 'y'}],
+        [{'start': 4, 'insert': 'x'}],
+        [{'start': 2, 'delete': 2}],
+        [{'start': -1, 'insert': 'x'}],
+        [{'start': 1, 'delete': -1}],
+    ):
+        with pytest.raises(ValueError, match='out of range or out of order'):
+            apply_splices('abc', splices)
+    # Offsets past the end count UTF-16 units, not code points
+    with pytest.raises(ValueError):
+        apply_splices(ASTRAL, [{'start': 5}])
+
+
+def test_malformed_splices_are_rejected():
+    """Anything but a list of well-formed splices raises ValueError"""
+    for splices in (None, {'start': 0}, 'abc'):
+        with pytest.raises(ValueError, match='must be a list'):
+            apply_splices('abc', splices)
+    for splice in ({}, {'start': 'x'}, {'start': 0, 'delete': None}, 'start', 3):
+        with pytest.raises(ValueError, match='needs an integer'):
+            apply_splices('abc', [splice])
+    with pytest.raises(ValueError, match='must be a string'):
+        apply_splices('abc', [{'start': 0, 'insert': 5}])
+    # A lone surrogate cannot be encoded (UnicodeEncodeError is a ValueError)
+    with pytest.raises(ValueError):
+        apply_splices('abc', [{'start': 0, 'insert': '\ud83d'}])
+
+
+if __name__ == "__main__":
+    test_basic_splices()
+    test_astral_characters_count_two_units()
+    test_splitting_a_surrogate_pair_is_rejected()
+    test_overlapping_and_out_of_range_splices_are_rejected()
+    test_malformed_splices_are_rejected()
+    print("✅ Text patch tests passed")
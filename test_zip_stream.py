@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Streaming ZIP writer tests: archives must read back with the stdlib zipfile
+"""
+
+import io
+import os
+import sys
+import zipfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services import zip_stream
+from src.services.zip_stream import stream_zip, ZIP_STORED, ZIP_DEFLATED
+
+FILES = {
+    'plain.md': b'# Plain\n\n' + b'Compressible text. ' * 200,
+    'Café 笔记 ✓.md': '# Non-ASCII name\n\ndéjà vu \U0001f600'.encode('utf-8'),
+    'empty.md': b'',
+    'random.bin': os.urandom(4096),
+}
+DATE = datetime(2024, 5, 17, 13, 45, 30)
+
+
+def files(date_time=DATE):
+    return [(name, date_time, lambda data=data: data) for name, data in FILES.items()]
+
+
+def read_back(archive):
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert zf.testzip() is None
+        return {info.filename: (info, zf.read(info)) for info in zf.infolist()}
+
+
+@contextmanager
+def limits(zip64=None, count=None):
+    """Lower the ZIP64 thresholds so small archives take the ZIP64 branches"""
+    saved = zip_stream.ZIP64_LIMIT, zip_stream.ZIP_COUNT_LIMIT
+    zip_stream.ZIP64_LIMIT = zip64 or saved[0]
+    zip_stream.ZIP_COUNT_LIMIT = count or saved[1]
+    try:
+        yield
+    finally:
+        zip_stream.ZIP64_LIMIT, zip_stream.ZIP_COUNT_LIMIT = saved
+
+
+def test_round_trip():
+    """Names (UTF-8 flagged), contents, methods and timestamps survive"""
+    entries = read_back(b''.join(stream_zip(files())))
+    assert list(entries) == list(FILES)
+    for name, (info, data) in entries.items():
+        assert data == FILES[name]
+        assert info.flag_bits & zip_stream.UTF8_FLAG
+        assert info.date_time == (2024, 5, 17, 13, 45, 30)
+    assert entries['plain.md'][0].compress_type == ZIP_DEFLATED
+    assert entries['random.bin'][0].compress_type == ZIP_STORED
+
+
+def test_dates_before_1980():
+    """DOS dates cannot go before 1980; such entries (and missing dates) get 1980-01-01"""
+    for date_time in (datetime(1970, 1, 1), None):
+        entries = read_back(b''.join(stream_zip(files(date_time))))
+        assert {info.date_time for info, _ in entries.values()} == {(1980, 1, 1, 0, 0, 0)}
+
+
+def test_executor_matches_serial():
+    """Compressing on a thread pool writes the same bytes, in order"""
+    many = [(f'note_{i}.md', DATE, lambda i=i: f'# Note {i}\n\n'.encode() * (i + 1)) for i in range(50)]
+    with ThreadPoolExecutor(4) as executor:
+        parallel = b''.join(stream_zip(iter(many), executor, window=3))
+    assert parallel == b''.join(stream_zip(iter(many)))
+    assert len(read_back(parallel)) == 50
+
+
+def test_zip64_sizes_and_offsets():
+    """Entries and offsets past the limit get ZIP64 extra fields and end records"""
+    with limits(zip64=100):
+        archive = b''.join(stream_zip(files()))
+    assert b'PK\x06\x06' in archive and b'PK\x06\x07' in archive
+    entries = read_back(archive)
+    assert {name: data for name, (_, data) in entries.items()} == FILES
+    assert entries['random.bin'][0].file_size == 4096
+
+
+def test_zip64_entry_count():
+    """More entries than the classic count field holds need the ZIP64 end record"""
+    many = [(f'{i}.md', DATE, lambda i=i: str(i).encode()) for i in range(20)]
+    with limits(count=10):
+        archive = b''.join(stream_zip(iter(many)))
+    assert b'PK\x06\x06' in archive
+    entries = read_back(archive)
+    assert [data for _, data in entries.values()] == [str(i).encode() for i in range(20)]
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_dates_before_1980()
+    test_executor_matches_serial()
+    test_zip64_sizes_and_offsets()
+    test_zip64_entry_count()
+    print("✅ ZIP stream tests passed")